@@ -1,17 +1,22 @@
 # app.py
+import atexit
+import logging
+import queue
 import threading
 import time
-import json
+from logging.handlers import QueueHandler, QueueListener
 import sys # To check import errors
+import traceback
+import orjson
 from flask import Flask, jsonify, request
-from flask_cors import CORS # To allow requests from your UI development server
+from flask.json.provider import JSONProvider
 
 # --- Import necessary components from your bot script ---
 # Assuming pump_bot.py is in the same directory
 try:
     from pump_bot import (
         monitor_and_sell,
-        monitored_tokens, # The shared state dictionary
+        get_published_snapshot, # Lock-free read-only (version, tokens, tokens JSON) view of the shared state
         load_state,
         save_state,
         SELL_DELAY_SECONDS,
@@ -27,124 +32,175 @@ except ImportError as e:
     sys.exit(1) # Exit if import fails
 except Exception as e:
     print(f"FATAL: An unexpected error occurred during import: {e}")
-    import traceback
-    traceback.print_exc()
+    traceback.print_exc() # Logging isn't configured yet at import time
     sys.exit(1)
 
+logger = logging.getLogger(__name__)
+
+class DeferredQueueHandler(QueueHandler):
+    """QueueHandler that enqueues records unformatted. The stock prepare() renders the message and
+    traceback on the logging thread; the queue here is in-process, so formatting can wait for the listener."""
+
+    def prepare(self, record):
+        return record
+
 # --- Flask App Setup ---
+class OrjsonProvider(JSONProvider):
+    """JSON provider backed by orjson. Types orjson can't encode natively (Decimal, ...) fall back to str(),
+    mirroring json's default=str; datetimes are emitted natively as ISO 8601."""
+
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj, default=str).decode()
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        # Hand orjson's bytes straight to the response; no intermediate str
+        return self._app.response_class(orjson.dumps(obj, default=str), mimetype="application/json")
+
 app = Flask(__name__)
-# Allow requests from your typical frontend development origin
-CORS(app, resources={r"/api/*": {"origins": "http://localhost:3000"}})
+app.json = OrjsonProvider(app) # Every jsonify() goes through orjson
+# --- CORS ---
+# Allow requests from your typical frontend development origin. All routes live under /api/, so the
+# headers are stamped unconditionally (a constant dict write per response, no per-request path matching).
+CORS_ORIGIN = "http://localhost:3000"
+
+@app.after_request
+def add_cors_headers(resp):
+    resp.headers["Access-Control-Allow-Origin"] = CORS_ORIGIN
+    resp.headers["Access-Control-Expose-Headers"] = "ETag"
+    if request.method == "OPTIONS": # Preflight
+        resp.headers["Access-Control-Allow-Methods"] = "GET, OPTIONS"
+        resp.headers["Access-Control-Allow-Headers"] = "Content-Type, If-None-Match"
+    return resp
+
+@app.route('/api/<path:_path>', methods=['OPTIONS'])
+def cors_preflight(_path):
+    """Answers CORS preflights for any /api/ path (existing routes get Flask's automatic OPTIONS)."""
+    return "", 204
 
 # --- State Management and Locking ---
-# A lock to safely access monitored_tokens from multiple threads
+# Guards monitored_tokens for writers (the bot thread and state saves). API readers never take it:
+# they read the snapshot published by pump_bot, so a plain mutex is enough here.
 state_lock = threading.Lock()
 bot_thread = None
-bot_running = False
+bot_ready = threading.Event() # Set by the bot thread once it is up; main waits on it instead of sleeping
 
 # --- Background Bot Task ---
 def run_bot_loop():
     """ Function to run the bot's main monitoring loop. """
-    global bot_running
-    print("[BOT] Starting bot loop in background thread...")
-    bot_running = True
+    logger.info("[BOT] Starting bot loop in background thread...")
+    bot_ready.set()
     try:
         # Pass the lock to the main bot function
-        print("[BOT] Calling monitor_and_sell...")
+        logger.debug("[BOT] Calling monitor_and_sell...")
         monitor_and_sell(state_lock)
     except Exception as e:
-        print(f"[ERROR] Bot loop encountered a fatal error: {e}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("[ERROR] Bot loop encountered a fatal error: %s", e)
         # Optionally, implement logic here to attempt a restart or notify
     finally:
-        print("[BOT] Bot loop thread has finished or crashed.")
-        bot_running = False
+        logger.info("[BOT] Bot loop thread has finished or crashed.")
         # Attempt a final save, acquiring the lock
-        print("[BOT] Attempting final state save...")
+        logger.info("[BOT] Attempting final state save...")
         try:
-            # We need the save_state function that accepts the lock
-            save_state(state_lock)
-            print("[BOT] Final state save attempt complete.")
+            # We need the save_state function that accepts the lock; wait so the write
+            # completes before the (daemon) saver thread can be torn down
+            save_state(state_lock, wait=True)
+            logger.info("[BOT] Final state save attempt complete.")
         except Exception as save_err:
-            print(f"[ERROR] during final state save: {save_err}")
+            logger.exception("[ERROR] during final state save: %s", save_err)
 
 
 
 # --- API Endpoints ---
+# Snapshot versions restart at 1 with the process, so ETags carry a per-process nonce: a client revalidating
+# a tag from a previous run can't get a 304 for different content.
+_ETAG_BOOT_ID = f"{time.time_ns():x}"
 
 @app.route('/api/status', methods=['GET'])
 def get_status():
     """Returns the current status of monitored tokens and bot running state."""
-    print("[API] GET /api/status called")
-    global monitored_tokens # Ensure we're accessing the global dict
-    tokens_snapshot = {}
-    is_running = bot_running # Get current running state
+    logger.debug("[API] GET /api/status called")
+    is_running = bot_thread is not None and bot_thread.is_alive() # Thread-safe, always current
 
     try:
-        with state_lock: # Acquire lock before reading shared state
-            # Create a deep copy for safety, especially with nested data potentially
-            # Using json loads/dumps is a common way for complex objects
-            tokens_snapshot = json.loads(json.dumps(monitored_tokens, default=str))
-
-        response_data = {
-            "bot_running": is_running,
-            "tokens": tokens_snapshot
-        }
-        print(f"[API] /api/status response: bot_running={is_running}, tokens_count={len(tokens_snapshot)}")
-        return jsonify(response_data)
+        # The bot publishes an immutable, versioned snapshot after each mutation, already serialized;
+        # no lock, copy or per-request encoding needed here
+        version, tokens_snapshot, tokens_json = get_published_snapshot()
+        etag = f"{_ETAG_BOOT_ID}-{version}-{int(is_running)}"
+        if request.if_none_match.contains_weak(etag):
+            # Client already has this exact state: skip the body entirely
+            not_modified = app.response_class(status=304)
+            not_modified.set_etag(etag)
+            return not_modified
+        logger.debug("[API] /api/status response: bot_running=%s, tokens_count=%d", is_running, len(tokens_snapshot))
+        # Emit the envelope and the (possibly large) pre-encoded tokens as separate chunks rather than
+        # concatenating, so the body is never copied into a second buffer. Werkzeug still derives
+        # Content-Length from a list body.
+        chunks = [b'{"bot_running":true,"tokens":' if is_running else b'{"bot_running":false,"tokens":', tokens_json, b"}"]
+        resp = app.response_class(chunks, mimetype="application/json")
+        resp.set_etag(etag)
+        return resp
     except Exception as e:
-         print(f"[ERROR] in /api/status: {e}")
-         import traceback
-         traceback.print_exc()
+         logger.exception("[ERROR] in /api/status: %s", e)
          # Return cached data or error message
          return jsonify({"error": "Failed to get status", "bot_running": is_running, "tokens": {}}), 500
 
 
+# Config values are module-level constants, so the response body is serialized once at import.
+# Only the bytes are cached: a Response object can't be shared since add_cors_headers mutates its headers.
+_CONFIG_BODY = orjson.dumps({
+    "sell_delay_seconds": SELL_DELAY_SECONDS,
+    # Emitted as JSON numbers: clients parse them as floats anyway, and both values need far
+    # fewer than float's ~15 significant digits (SOL has 9 decimals)
+    "take_profit_sol": float(TAKE_PROFIT_SOL),
+    "slippage_percent": float(SLIPPAGE_PERCENT),
+    "check_interval_seconds": CHECK_INTERVAL_SECONDS,
+    "state_file": STATE_FILE
+})
+
 @app.route('/api/config', methods=['GET'])
 def get_config():
     """Returns the current bot configuration."""
-    print("[API] GET /api/config called")
-    try:
-        # Read config directly from the imported variables
-        config_data = {
-            "sell_delay_seconds": SELL_DELAY_SECONDS,
-            "take_profit_sol": str(TAKE_PROFIT_SOL), # Convert Decimal
-            "slippage_percent": str(SLIPPAGE_PERCENT), # Convert Decimal
-            "check_interval_seconds": CHECK_INTERVAL_SECONDS,
-            "state_file": STATE_FILE
-        }
-        print(f"[API] /api/config response: {config_data}")
-        return jsonify(config_data)
-    except Exception as e:
-        print(f"[ERROR] in /api/config: {e}")
-        import traceback
-        traceback.print_exc()
-        return jsonify({"error": "Failed to get config"}), 500
+    logger.debug("[API] GET /api/config called")
+    return app.response_class(_CONFIG_BODY, mimetype="application/json")
 
 
 # --- Main Execution ---
 if __name__ == '__main__':
-    print("Initializing Flask app...")
+    # Records are queued as-is by the calling thread; a listener thread formats them and writes them to
+    # stderr, so neither the bot loop nor request handlers spend time on formatting or console I/O
+    log_queue = queue.SimpleQueue()
+    console_handler = logging.StreamHandler()
+    console_handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s"))
+    log_listener = QueueListener(log_queue, console_handler)
+    log_listener.start()
+    atexit.register(log_listener.stop) # Drains what's still queued
+    queue_handler = DeferredQueueHandler(log_queue) # Message, layout and tracebacks are rendered by console_handler
+    logging.basicConfig(level=logging.INFO, handlers=[queue_handler])
+    logger.info("Initializing Flask app...")
 
     # Start the bot loop in a background thread
-    # Check if thread is already running perhaps? (simple check for now)
-    if bot_thread is None or not bot_thread.is_alive():
-        print("Starting bot thread...")
-        bot_thread = threading.Thread(target=run_bot_loop, daemon=True) # daemon=True allows main thread to exit even if bot hangs
-        bot_thread.start()
-    else:
-        print("Bot thread already running.")
-
+    logger.info("Starting bot thread...")
+    bot_thread = threading.Thread(target=run_bot_loop, daemon=True) # daemon=True allows main thread to exit even if bot hangs
+    bot_thread.start()
 
-    # Give the bot thread a moment to initialize (optional, adjust if needed)
-    time.sleep(2)
-    if not bot_running:
-         print("Warning: Bot thread may not have started correctly.")
+    # Wait for the bot thread to signal it started (returns immediately in the common case)
+    if not bot_ready.wait(timeout=5):
+         logger.warning("Warning: Bot thread may not have started correctly.")
 
 
-    print("Starting Flask server on http://127.0.0.1:5001 ...")
+    logger.info("Starting API server on http://127.0.0.1:5001 ...")
     # Use port 5001 to avoid conflicts
-    # Set debug=False for stability when using threads/background tasks
-    # Set use_reloader=False explicitly can also help prevent issues with threads running twice
-    app.run(host='127.0.0.1', port=5001, debug=False, use_reloader=False)
+    # Serve in-process (so the bot thread and the API share pump_bot's state) with a thread pool,
+    # letting concurrent /api/status and /api/config requests overlap
+    try:
+        from waitress import serve
+        serve(app, host='127.0.0.1', port=5001, threads=8)
+    except ImportError:
+        logger.warning("waitress not installed; falling back to the Flask development server.")
+        # Set debug=False for stability when using threads/background tasks
+        # Set use_reloader=False explicitly can also help prevent issues with threads running twice
+        app.run(host='127.0.0.1', port=5001, debug=False, use_reloader=False, threaded=True)
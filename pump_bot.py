@@ -2,23 +2,43 @@
 # --- Corrected imports ---
 import os
 import time
-import base58
+import asyncio
+import atexit
+import base64
+import heapq
+import itertools
+import logging
 import re
-import json
+import struct
+import orjson
+import queue
+import tempfile
 from decimal import Decimal
 import threading # <<< Added for Lock type hint and usage
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FutureTimeoutError
 
+import httpx
 from dotenv import load_dotenv
-from borsh_construct import CStruct, U64, Bool, Bytes, Vec, U8
+
+# Optional: libuv-backed event loop for the WebSocket thread (uvloop, or winloop on Windows)
+try:
+    import uvloop as fast_event_loop
+except ImportError:
+    try:
+        import winloop as fast_event_loop
+    except ImportError:
+        fast_event_loop = None
 
 # --- Solana/Solders Core Imports ---
 from solders.keypair import Keypair
 from solders.pubkey import Pubkey
+from solders.signature import Signature
 from solders.system_program import ID as SYS_PROGRAM_ID
 from solders.token import ID as TOKEN_PROGRAM_ID
 from solders.compute_budget import set_compute_unit_limit, set_compute_unit_price
 from solders.sysvar import RENT as RENT_PROGRAM_ID
 from solders.transaction import Transaction, TransactionError
+from solders.message import Message
 from solders.instruction import Instruction as TransactionInstruction
 from solders.instruction import AccountMeta
 
@@ -30,11 +50,24 @@ from solana.rpc.api import Client
 from solana.rpc.commitment import Confirmed, Processed
 from solana.rpc.types import TokenAccountOpts, TxOpts, Memcmp, DataSliceOpts
 from solana.exceptions import SolanaRpcException
+from solana.rpc.websocket_api import SolanaWsClientProtocol, connect as ws_connect
+from solders.commitment_config import CommitmentLevel
+from solders.account_decoder import UiAccountEncoding
+from solders.rpc.config import RpcAccountInfoConfig, RpcTransactionConfig, RpcTransactionLogsFilterMentions, RpcSignatureSubscribeConfig
+from solders.rpc.requests import AccountSubscribe, AccountUnsubscribe, GetTransaction, SignatureSubscribe
+from solders.rpc.responses import AccountNotification, GetTransactionResp, LogsNotification, SignatureNotification, SubscriptionResult
+from solders.transaction_status import TransactionConfirmationStatus, UiTransactionEncoding
 # --- End Corrected Imports ---
 
+# Runtime messages go through logging (configured by app.py); import-time ones below stay as print,
+# since logging isn't set up yet when app.py imports this module.
+logger = logging.getLogger(__name__)
+
 # --- Configuration ---
 load_dotenv()
 RPC_URL = os.getenv("RPC_URL")
+# WebSocket endpoint for push subscriptions; defaults to RPC_URL with http(s) swapped for ws(s)
+WS_URL = os.getenv("WS_URL") or (re.sub(r"^http", "ws", RPC_URL) if RPC_URL else None)
 DEV_PRIVATE_KEY_B58 = os.getenv("DEV_PRIVATE_KEY")
 
 # --- Constants ---
@@ -44,33 +77,101 @@ PUMP_FUN_ACCOUNT = Pubkey.from_string("32dGqHQQxVPdUJK6m1x5NUKM4wxa3b3tfpsufn4BG
 GLOBAL_ACCOUNT = Pubkey.from_string("4wTV1YmiEkRvAtNtsSGPtUrqRYQgFpxwGJaAhrfeJWyd")
 FEE_RECIPIENT = Pubkey.from_string("CebN5WGQ4jvEPvsVU4EoHEpgzq1VV7AbicfhtW4f57gj")
 MINT_AUTHORITY = Pubkey.from_string("TSLvdd1pWpaJaHhSV43gHX6JuXdDgTdfKGiHrAFfNBG")
-CREATE_IX_DISCRIMINATOR_B58 = "3Bf4qLf4hW"
-CREATE_IX_DISCRIMINATOR_BYTES = base58.b58decode(CREATE_IX_DISCRIMINATOR_B58)
+CREATE_IX_DISCRIMINATOR = bytes([24, 30, 200, 40, 5, 28, 7, 119]) # Anchor sha256("global:create")[:8]
 SELL_INSTRUCTION_DISCRIMINATOR = bytes([0x75, 0x1a, 0x89, 0xe0, 0x3c, 0x13, 0xd2, 0x31])
+CREATE_EVENT_DISCRIMINATOR = bytes([27, 114, 169, 77, 222, 235, 99, 118]) # Anchor "event:CreateEvent"
+PUMP_FUN_INVOKE_LOG_PREFIX = f"Program {PUMP_FUN_PROGRAM_ID} invoke"
+PUMP_FUN_CREATE_LOG = "Program log: Instruction: Create"
+PROGRAM_DATA_LOG_PREFIX = "Program data: "
+
+# --- Token Statuses ---
+# Tokens in these statuses are fetched and evaluated every cycle; all other statuses are final
+ACTIVE_STATUSES = frozenset({"monitoring", "sell_failed"})
+# Field changes for an active token with no sell to attempt this cycle, by status: a failed sell whose
+# signal has cleared goes back to plain monitoring with a fresh retry budget
+NO_SELL_UPDATES = {
+    "monitoring": {},
+    "sell_failed": {"status": "monitoring", "sell_attempts": 0},
+}
 
 # --- Bot Settings ---
 # (Read from .env, provide defaults)
 SELL_DELAY_SECONDS = int(os.getenv("SELL_DELAY_SECONDS", 15))
 TAKE_PROFIT_SOL = Decimal(os.getenv("TAKE_PROFIT_SOL", "0.05"))
 CHECK_INTERVAL_SECONDS = int(os.getenv("CHECK_INTERVAL_SECONDS", 2))
+# The cycle interval adapts between these (AIMD): it grows while cycles are slow or there's nothing
+# to monitor, and shrinks back to the floor when cycles are quick
+MIN_CHECK_INTERVAL_SECONDS = float(os.getenv("MIN_CHECK_INTERVAL_SECONDS", CHECK_INTERVAL_SECONDS))
+MAX_CHECK_INTERVAL_SECONDS = float(os.getenv("MAX_CHECK_INTERVAL_SECONDS", CHECK_INTERVAL_SECONDS * 5))
 MAX_SELL_RETRIES = int(os.getenv("MAX_SELL_RETRIES", 5))
 RETRY_DELAY_SECONDS = int(os.getenv("RETRY_DELAY_SECONDS", 2))
 SLIPPAGE_PERCENT = Decimal(os.getenv("SLIPPAGE_PERCENT", "25.0"))
 TRANSACTION_PRIORITY_MICRO_LAMPORTS = int(os.getenv("TRANSACTION_PRIORITY_MICRO_LAMPORTS", 50000))
 TRANSACTION_COMPUTE_UNITS = int(os.getenv("TRANSACTION_COMPUTE_UNITS", 200000))
 STATE_FILE = os.getenv("STATE_FILE", "bot_state.json")
+STATE_FILE_PRETTY = os.getenv("STATE_FILE_PRETTY", "false").lower() in ("1", "true", "yes") # Indent the file for reading by hand
+# Integer forms of the Decimal settings for the hot path (lamports and basis points)
+LAMPORTS_PER_SOL = 10**9
+TAKE_PROFIT_LAMPORTS = int(TAKE_PROFIT_SOL * LAMPORTS_PER_SOL)
+SLIPPAGE_BPS = int(SLIPPAGE_PERCENT * 100)
+WS_RECONNECT_MAX_SECONDS = int(os.getenv("WS_RECONNECT_MAX_SECONDS", 60))
+SAVE_DEBOUNCE_SECONDS = float(os.getenv("SAVE_DEBOUNCE_SECONDS", 0.5)) # Minimum spacing between state file writes
+BLOCKHASH_TTL_SECONDS = float(os.getenv("BLOCKHASH_TTL_SECONDS", 5)) # Sells reuse a blockhash up to this old (valid ~60s)
+# accountSubscribe to active bonding curves so a price move wakes the monitor at once instead of waiting
+# out CHECK_INTERVAL_SECONDS (which remains the HTTP polling baseline)
+CURVE_SUBSCRIPTIONS = os.getenv("CURVE_SUBSCRIPTIONS", "true").lower() in ("1", "true", "yes")
+CURVE_WAKE_MIN_INTERVAL_SECONDS = float(os.getenv("CURVE_WAKE_MIN_INTERVAL_SECONDS", 0.25)) # Floor on cycle spacing when woken
+RPC_CONCURRENCY = int(os.getenv("RPC_CONCURRENCY", 4)) # Independent RPC calls allowed in flight at once
+RPC_BATCH_SIZE = int(os.getenv("RPC_BATCH_SIZE", 50)) # getTransaction calls per JSON-RPC batch request
+SELL_WORKERS = int(os.getenv("SELL_WORKERS", 4)) # Sells sent and confirmed concurrently, off the monitor thread
+SIGNATURE_MAX_ATTEMPTS = int(os.getenv("SIGNATURE_MAX_ATTEMPTS", 5)) # Fetches of a DEV signature before it's skipped
+CONFIRM_TIMEOUT_SECONDS = int(os.getenv("CONFIRM_TIMEOUT_SECONDS", 60)) # Wait for a sell's signatureSubscribe notification
 
 # --- Global State (Accessed by multiple threads via Flask app) ---
 monitored_tokens = {} # This dictionary is shared
+# Newest DEV wallet signature already checked for creations (base58), persisted with the state so
+# polling after a restart only fetches signatures made since. Guarded by the same lock.
+last_checked_signature = None
+# Read-only copy of monitored_tokens for lock-free readers (the API): (version, snapshot, JSON bytes).
+# Rebound (never mutated) by publish_snapshot(); a single reference assignment is atomic.
+_snapshot_versions = itertools.count(1)
+_published_tokens = (0, {}, b"{}")
+# What the state saver writes: (last_checked_signature, tokens, tokens JSON) from the same publish, so
+# the file never pairs a watermark with tokens from a different moment.
+_published_state = (None, {}, b"{}")
 
 # --- Solana Client & Wallet ---
+RPC_TIMEOUT_SECONDS = 30.0
+
+def _build_rpc_session() -> httpx.Client:
+    """ HTTP session for RPC calls: a persistent keep-alive pool, multiplexed over HTTP/2 when the
+    'h2' package is installed (httpx raises ImportError for http2=True without it). On HTTP/1.1 the
+    pool keeps one connection per concurrent caller: RPC pool, sell workers and the monitor thread. """
+    # Every RPC caller (the RPC pool workers, the sell workers and the monitor thread) keeps its own warm
+    # connection on HTTP/1.1, so concurrent calls never churn through fresh TCP/TLS handshakes
+    limits = httpx.Limits(max_keepalive_connections=RPC_CONCURRENCY + SELL_WORKERS + 1, keepalive_expiry=300)
+    try:
+        return httpx.Client(http2=True, timeout=RPC_TIMEOUT_SECONDS, limits=limits)
+    except ImportError:
+        print("Warning: 'h2' not installed; RPC session falls back to HTTP/1.1 keep-alive.")
+        return httpx.Client(timeout=RPC_TIMEOUT_SECONDS, limits=limits)
+
+# Runs independent RPC calls concurrently (the sync Client and its httpx session are thread-safe)
+_rpc_pool = ThreadPoolExecutor(max_workers=RPC_CONCURRENCY, thread_name_prefix="rpc")
+# Runs execute_sell (send + confirmation wait) so a pending sell never holds up the monitor loop.
+# Separate from _rpc_pool: a sell can block for CONFIRM_TIMEOUT_SECONDS.
+_sell_pool = ThreadPoolExecutor(max_workers=SELL_WORKERS, thread_name_prefix="sell")
+
 # Defined globally for access by helper functions
 solana_client = None
 DEV_WALLET = None
 DEV_PUBLIC_KEY = None
 try:
     if not RPC_URL: raise ValueError("RPC_URL not found in .env")
-    solana_client = Client(RPC_URL, commitment=Confirmed, timeout=30.0)
+    solana_client = Client(RPC_URL, commitment=Confirmed, timeout=RPC_TIMEOUT_SECONDS)
+    # Swap the provider's default session for the HTTP/2 keep-alive one (Client has no session parameter)
+    solana_client._provider.session.close()
+    solana_client._provider.session = _build_rpc_session()
     if not DEV_PRIVATE_KEY_B58: raise ValueError("DEV_PRIVATE_KEY not found in .env")
     DEV_WALLET = Keypair.from_base58_string(DEV_PRIVATE_KEY_B58)
     DEV_PUBLIC_KEY = DEV_WALLET.pubkey()
@@ -81,63 +182,167 @@ except Exception as e:
     raise SystemExit(f"Failed to initialize Solana connection: {e}")
 
 
-# --- Borsh Schemas ---
-BONDING_CURVE_LAYOUT = CStruct(
-    "virtual_token_reserves" / U64, "virtual_sol_reserves" / U64,
-    "real_token_reserves" / U64, "real_sol_reserves" / U64,
-    "token_total_supply" / U64, "complete" / Bool,
+# --- Borsh Layouts ---
+# Fixed-size borsh structs map 1:1 onto little-endian struct formats (u64 -> Q, bool -> ?),
+# which parse/build in C without per-field Container allocation.
+# virtual_token_reserves, virtual_sol_reserves, real_token_reserves, real_sol_reserves, token_total_supply, complete
+BONDING_CURVE_LAYOUT = struct.Struct("<QQQQQ?")
+# token_amount, min_sol_output
+SELL_INSTRUCTION_PAYLOAD = struct.Struct("<QQ")
+SPL_TOKEN_AMOUNT_OFFSET = 64 # SPL token account: mint(32) + owner(32) + amount(u64) + ...
+MAX_ACCOUNTS_PER_REQUEST = 100 # getMultipleAccounts limit
+# One slice for both account kinds: curve discriminator + layout (8 + 41) and token amount (64 + 8)
+ACCOUNT_DATA_SLICE = DataSliceOpts(offset=0, length=SPL_TOKEN_AMOUNT_OFFSET + 8)
+# getTransaction options for creation detection: raw (base64) transactions, v0 messages allowed
+TRANSACTION_CONFIG = RpcTransactionConfig(
+    encoding=UiTransactionEncoding.Base64, commitment=CommitmentLevel.Confirmed, max_supported_transaction_version=0
 )
-SELL_INSTRUCTION_PAYLOAD = CStruct("token_amount" / U64, "min_sol_output" / U64)
+
+# --- Sell Instruction Scaffolding ---
+# The parts of a sell that never change between mints, built once at load instead of per attempt.
+# Account order around the 4 per-mint metas (2-5) inserted by get_sell_accounts:
+_SELL_METAS_PREFIX = [
+    AccountMeta(GLOBAL_ACCOUNT, False, False),           # 0. Global
+    AccountMeta(FEE_RECIPIENT, False, True),             # 1. Fee Recipient (W)
+]
+_SELL_METAS_SUFFIX = [
+    AccountMeta(DEV_PUBLIC_KEY, True, True),             # 6. Seller (WS)
+    AccountMeta(SYS_PROGRAM_ID, False, False),           # 7. System Program
+    AccountMeta(ASSOCIATED_TOKEN_PROGRAM_ID, False, False),# 8. ATA Program
+    AccountMeta(TOKEN_PROGRAM_ID, False, False),         # 9. Token Program
+    AccountMeta(PUMP_FUN_ACCOUNT, False, False),         # 10. Pump Fun Account
+    AccountMeta(RENT_PROGRAM_ID, False, False),          # 11. Rent Sysvar
+]
+# Compute budget instructions prepended to every sell (depend only on settings)
+_COMPUTE_BUDGET_IXS = []
+if TRANSACTION_PRIORITY_MICRO_LAMPORTS > 0: _COMPUTE_BUDGET_IXS.append(set_compute_unit_price(TRANSACTION_PRIORITY_MICRO_LAMPORTS))
+if TRANSACTION_COMPUTE_UNITS > 0: _COMPUTE_BUDGET_IXS.append(set_compute_unit_limit(TRANSACTION_COMPUTE_UNITS))
 
 
 # --- Helper Functions (Modified for Thread Safety) ---
 
-def save_state(lock: threading.Lock): # <<< Accept lock
-    """Saves the monitored_tokens state to a JSON file safely."""
-    global monitored_tokens
-    state_to_save = {}
-    # Acquire lock to get a consistent copy of the state
-    with lock:
-        # Using json dumps/loads ensures serializability and creates a deep copy
-        try:
-            state_to_save = json.loads(json.dumps(monitored_tokens, default=str))
-        except Exception as json_err:
-             print(f"Error serializing state for saving: {json_err}")
-             return # Don't proceed if serialization fails
+# Saves are debounced: save_state() only sets a dirty flag, and the saver thread writes the state at
+# most once per SAVE_DEBOUNCE_SECONDS. A burst of status changes costs one write, and the bot loop
+# never touches the file. What gets written is the state last published by publish_snapshot()
+# (already copied and serialized), so the saver needs neither the lock nor a copy of its own.
+_state_dirty = threading.Event()
+_state_write_lock = threading.Lock() # Serializes file writes (saver thread vs. blocking flushes)
+_saver_thread = None
 
-    # Perform file I/O outside the lock to minimize lock hold time
+def _write_state_file(state_json: bytes):
+    """Atomically writes serialized state to STATE_FILE (temp file in the same dir + rename)."""
+    state_dir = os.path.dirname(os.path.abspath(STATE_FILE))
+    fd, tmp_path = tempfile.mkstemp(dir=state_dir, prefix=".bot_state.", suffix=".tmp")
     try:
-        with open(STATE_FILE, "w") as f:
-            json.dump(state_to_save, f, indent=4)
-        # print(f"State saved ({len(state_to_save)} tokens)") # Reduce log noise
-    except Exception as e:
-        print(f"Error saving state to file {STATE_FILE}: {e}")
+        with os.fdopen(fd, "wb") as f:
+            f.write(state_json)
+        os.replace(tmp_path, STATE_FILE)
+    except Exception:
+        try: os.remove(tmp_path)
+        except OSError: pass
+        raise
+
+def _flush_state():
+    """Writes the last published state: the signature watermark plus the pre-encoded tokens."""
+    with _state_write_lock:
+        _state_dirty.clear() # Before reading: a save requested after this marks the state dirty again
+        last_signature, tokens, tokens_json = _published_state # One load: a consistent set
+        if STATE_FILE_PRETTY:
+            state_json = orjson.dumps({"last_signature": last_signature, "tokens": tokens}, default=str, option=orjson.OPT_INDENT_2)
+        else:
+            # Compact (~3x smaller than indented); only the watermark is encoded here
+            state_json = b'{"last_signature":' + orjson.dumps(last_signature) + b',"tokens":' + tokens_json + b"}"
+        _write_state_file(state_json)
+
+def _state_saver_loop():
+    """ Saver thread: flushes the state shortly after it is marked dirty. """
+    while True:
+        _state_dirty.wait()
+        time.sleep(SAVE_DEBOUNCE_SECONDS) # Let the rest of a burst land in the same write
+        if not _state_dirty.is_set(): continue # Already flushed by a blocking save
+        try:
+            _flush_state()
+            # print(f"State saved") # Reduce log noise
+        except Exception as e:
+            logger.error("Error saving state to file %s: %s", STATE_FILE, e)
+
+def _ensure_state_saver():
+    """Starts the saver thread on first use (or if it died)."""
+    global _saver_thread
+    if _saver_thread is None or not _saver_thread.is_alive():
+        _saver_thread = threading.Thread(target=_state_saver_loop, daemon=True, name="state-saver")
+        _saver_thread.start()
+
+def save_state(lock: threading.Lock, wait: bool = False): # <<< Accept lock
+    """Marks the state dirty; the saver thread writes the published state within SAVE_DEBOUNCE_SECONDS.
+    Call publish_snapshot() first. With wait=True, publishes and writes synchronously instead (shutdown)."""
+    if wait:
+        publish_snapshot(lock)
+        _flush_state()
+        return
+    _ensure_state_saver()
+    _state_dirty.set()
+
+@atexit.register
+def _flush_state_at_exit():
+    """Writes any change the debounce hasn't flushed yet when the process exits."""
+    if _state_dirty.is_set():
+        try:
+            _flush_state()
+        except Exception as e:
+            logger.error("Error saving state to file %s at exit: %s", STATE_FILE, e)
 
 def load_state(lock: threading.Lock): # <<< Accept lock
-    """Loads the monitored_tokens state from a JSON file safely."""
-    global monitored_tokens
+    """Loads the monitored_tokens state (and signature watermark) from a JSON file safely."""
+    global monitored_tokens, last_checked_signature
     if os.path.exists(STATE_FILE):
         try:
-            with open(STATE_FILE, "r") as f:
-                loaded_data = json.load(f)
+            with open(STATE_FILE, "rb") as f:
+                loaded_data = orjson.loads(f.read())
+            # Current format wraps the tokens; older files are the bare token dict
+            last_signature = None
+            if isinstance(loaded_data, dict) and isinstance(loaded_data.get("tokens"), dict):
+                last_signature = loaded_data.get("last_signature")
+                loaded_data = loaded_data["tokens"]
             # Validate loaded data structure if needed before assigning
             if isinstance(loaded_data, dict):
                  with lock: # <<< Acquire lock to update shared state
                      monitored_tokens = loaded_data
-                 print(f"Loaded {len(loaded_data)} tokens from {STATE_FILE}")
+                     last_checked_signature = last_signature
+                 logger.info("Loaded %d tokens from %s", len(loaded_data), STATE_FILE)
             else:
-                 print(f"Warning: Invalid data format in {STATE_FILE}. Starting fresh.")
+                 logger.warning("Invalid data format in %s. Starting fresh.", STATE_FILE)
                  with lock: monitored_tokens = {}
 
-        except json.JSONDecodeError:
-            print(f"Error decoding JSON from {STATE_FILE}. Starting fresh.")
+        except orjson.JSONDecodeError:
+            logger.error("Error decoding JSON from %s. Starting fresh.", STATE_FILE)
             with lock: monitored_tokens = {}
         except Exception as e:
-            print(f"Error loading state from {STATE_FILE}: {e}")
+            logger.error("Error loading state from %s: %s", STATE_FILE, e)
             with lock: monitored_tokens = {}
     else:
-        print(f"State file {STATE_FILE} not found. Starting fresh.")
+        logger.info("State file %s not found. Starting fresh.", STATE_FILE)
         with lock: monitored_tokens = {} # Ensure it's initialized if file missing
+    publish_snapshot(lock)
+
+
+def publish_snapshot(lock: threading.Lock):
+    """Publishes a fresh copy of monitored_tokens, and its JSON encoding, for lock-free readers.
+    Call after mutating the dict. Serializing here (on writes) saves every reader from doing it."""
+    global _published_tokens, _published_state
+    with lock:
+        snapshot = {mint: dict(data) for mint, data in monitored_tokens.items()}
+        last_signature = last_checked_signature
+    snapshot_json = orjson.dumps(snapshot, default=str) # Outside the lock
+    _published_state = (last_signature, snapshot, snapshot_json)
+    if snapshot_json == _published_tokens[2]:
+        return # Nothing changed; keep the version so clients' ETags stay valid
+    # Atomic swap: readers see the old or the new triple, never a mix
+    _published_tokens = (next(_snapshot_versions), snapshot, snapshot_json)
+
+def get_published_snapshot():
+    """Returns (version, snapshot, snapshot_json) from one publish, read consistently in one load."""
+    return _published_tokens
 
 
 # --- Other Helper Functions (No direct modification of monitored_tokens needed) ---
@@ -150,28 +355,34 @@ def get_sol_balance(pubkey: Pubkey) -> Decimal:
         balance_resp = solana_client.get_balance(pubkey, commitment=Processed)
         return Decimal(balance_resp.value) / Decimal(1e9)
     except SolanaRpcException as e:
-        print(f"Warning: Could not get SOL balance for {pubkey}: {e}")
+        logger.warning("Could not get SOL balance for %s: %s", pubkey, e)
         return Decimal("-1")
     except Exception as e:
-        print(f"Unexpected error getting SOL balance for {pubkey}: {e}")
+        logger.error("Unexpected error getting SOL balance for %s: %s", pubkey, e)
         return Decimal("-1")
 
-def get_token_balance(token_account_pk: Pubkey) -> int:
-    """Gets the token balance (raw amount/lamports) of a specific token account."""
-    if not solana_client: return -1 # Check if client initialized
-    try:
-        resp = solana_client.get_token_account_balance(token_account_pk, commitment=Processed)
-        if resp.value and isinstance(resp.value.amount, str) and resp.value.amount.isdigit():
-                 return int(resp.value.amount)
-        return 0
-    except SolanaRpcException as e:
-        if "Account does not exist" in str(e) or "AccountNotFound" in str(e) or "could not find account" in str(e):
-            return 0
-        print(f"Warning: RPC Error getting token balance for {token_account_pk}: {e}")
-        return -1
-    except Exception as e:
-        print(f"Unexpected error getting token balance for {token_account_pk}: {e}")
-        return -1
+# Parsed (mint_pk, bonding_curve_pk, dev_ata_pk) per mint. Records keep base58 strings (JSON state),
+# so this spares the monitor loop and sells re-decoding them. Filled when a mint is added (straight from
+# the derivation) or on first use after a state load. Only accessed from the bot thread.
+_token_keys_cache = {}
+
+def get_token_keys(mint_str: str, bonding_curve_str: str, dev_ata_str: str):
+    """Returns (mint_pk, bonding_curve_pk, dev_ata_pk) for a mint, parsing the stored strings only once."""
+    keys = _token_keys_cache.get(mint_str)
+    if keys is None:
+        keys = (Pubkey.from_string(mint_str), Pubkey.from_string(bonding_curve_str), Pubkey.from_string(dev_ata_str))
+        _token_keys_cache[mint_str] = keys
+    return keys
+
+def update_token(lock: threading.Lock, mint_str: str, changes: dict) -> bool:
+    """ Applies a token's accumulated field changes in one lock acquisition. Returns whether anything
+    worth persisting changed (status/attempts, not the per-cycle value and check time); the caller
+    publishes and saves once per cycle. """
+    with lock:
+        token_data = monitored_tokens.get(mint_str)
+        if token_data is None: return False
+        token_data.update(changes)
+    return "status" in changes or "sell_attempts" in changes
 
 def derive_bonding_curve_pda(mint_pk: Pubkey) -> Pubkey:
     """Derives the bonding curve PDA for a given mint."""
@@ -179,417 +390,832 @@ def derive_bonding_curve_pda(mint_pk: Pubkey) -> Pubkey:
     pda, _ = Pubkey.find_program_address(seeds, PUMP_FUN_PROGRAM_ID)
     return pda
 
-def get_bonding_curve_state(bonding_curve_pk: Pubkey):
-    """ Fetches and parses the account data for a Pump.fun bonding curve. """
-    if not solana_client: return None # Check if client initialized
+def parse_bonding_curve_data(data: bytes):
+    """ Parses raw Pump.fun bonding curve account data (discriminator + layout). None if too short. """
+    # Check data length against expected size
+    if len(data) < (8 + BONDING_CURVE_LAYOUT.size):
+        return None
+
+    (virtual_token_reserves, virtual_sol_reserves, real_token_reserves, real_sol_reserves,
+     token_total_supply, complete) = BONDING_CURVE_LAYOUT.unpack_from(data, 8) # Skip 8-byte discriminator
+
+    # Price is virtual_sol_reserves / virtual_token_reserves (lamports per raw token unit); callers
+    # value holdings with integer math via token_value_lamports() rather than a Decimal price.
+    return {
+        "virtual_token_reserves": virtual_token_reserves,
+        "virtual_sol_reserves": virtual_sol_reserves,
+        "real_token_reserves": real_token_reserves,
+        "real_sol_reserves": real_sol_reserves,
+        "token_total_supply": token_total_supply,
+        "is_complete": complete,
+    }
+
+def token_value_lamports(curve_state, token_amount: int) -> int:
+    """Values a raw token amount at the curve's current price, in lamports (integer math, floor)."""
+    virtual_token_reserves = curve_state["virtual_token_reserves"]
+    if virtual_token_reserves <= 0: return 0
+    return token_amount * curve_state["virtual_sol_reserves"] // virtual_token_reserves
+
+def _fetch_states_batch(batch):
+    """ One getMultipleAccounts call for up to MAX_ACCOUNTS_PER_REQUEST // 2 tokens (see submit_state_fetches). """
+    results = {}
+    keys = [pk for _, bonding_curve_pk, dev_ata_pk in batch for pk in (bonding_curve_pk, dev_ata_pk)]
+    accounts = None
     try:
-        data_slice = DataSliceOpts(offset=0, length=64) # Fetch enough for layout + discriminator
-        acc_info_resp = solana_client.get_account_info(
-            bonding_curve_pk, commitment=Processed, encoding="base64", data_slice=data_slice
+        resp = solana_client.get_multiple_accounts(
+            keys, commitment=Processed, encoding="base64", data_slice=ACCOUNT_DATA_SLICE
         )
-        # Check response structure carefully
-        if not acc_info_resp or not acc_info_resp.value or not acc_info_resp.value.data:
-            return None
-
-        data = acc_info_resp.value.data
-        # Check data length against expected size
-        if len(data) < (8 + BONDING_CURVE_LAYOUT.sizeof()):
-            # print(f"Warning: Bonding curve data too short for {bonding_curve_pk}. Length: {len(data)}")
-            return None
-
-        parsed_data = BONDING_CURVE_LAYOUT.parse(data[8:]) # Skip 8-byte discriminator
-
-        price_sol_per_token = Decimal(0)
-        # Use Decimal for calculations involving reserves
-        virtual_sol_reserves_dec = Decimal(parsed_data.virtual_sol_reserves)
-        virtual_token_reserves_dec = Decimal(parsed_data.virtual_token_reserves)
-
-        if virtual_token_reserves_dec > 0:
-            price_lamports_per_lamport = virtual_sol_reserves_dec / virtual_token_reserves_dec
-            price_sol_per_token = price_lamports_per_lamport * (Decimal(10**6) / Decimal(10**9)) # Assume 6 token decimals
-
-        return {
-            "virtual_token_reserves": parsed_data.virtual_token_reserves,
-            "virtual_sol_reserves": parsed_data.virtual_sol_reserves,
-            "real_token_reserves": parsed_data.real_token_reserves,
-            "real_sol_reserves": parsed_data.real_sol_reserves,
-            "token_total_supply": parsed_data.token_total_supply,
-            "is_complete": parsed_data.complete,
-            "price_sol_per_token": price_sol_per_token # Return as Decimal
-        }
+        accounts = resp.value
     except SolanaRpcException as e:
-        # Reduce noise for common errors like account not found yet
-        if "AccountNotFound" not in str(e) and "could not find account" not in str(e):
-            print(f"Warning: RPC Error fetching bonding curve {bonding_curve_pk} state: {e}")
-        return None
+        logger.warning("RPC Error fetching %d token states: %s", len(batch), e)
     except Exception as e:
-        print(f"Warning: Error parsing bonding curve {bonding_curve_pk} data: {e}")
-        return None
+        logger.error("Unexpected error fetching %d token states: %s", len(batch), e)
 
-def find_dev_created_pump_fun_mints(transactions):
-    """ Parses transactions to find Pump.fun creations by DEV_WALLET using 'create' ix discriminator. """
-    if not solana_client: return [] # Check if client initialized
-    new_mints = []
-    # (Keep the implementation from the last correct version)
-    try:
-        for sig in transactions:
-            tx_resp = solana_client.get_transaction(
-                sig, encoding="base64", max_supported_transaction_version=0, commitment=Confirmed
-            )
-            if not tx_resp or not tx_resp.value or not tx_resp.value.transaction: continue
-
-            tx_raw = tx_resp.value.transaction.transaction
-            message = tx_raw.message
-            # Ensure account_keys is not empty before accessing index 0
-            if not message.account_keys or message.account_keys[0] != DEV_PUBLIC_KEY: continue # Check fee payer
-
-            for ix_raw in message.instructions:
-                # Prevent index out of bounds if program_id_index is invalid
-                if ix_raw.program_id_index >= len(message.account_keys): continue
-                program_id = message.account_keys[ix_raw.program_id_index]
-
-                if program_id == PUMP_FUN_PROGRAM_ID:
-                    try:
-                        ix_data = base58.b58decode(ix_raw.data)
-                    except Exception: # Handle potential decoding errors
-                        continue
+    for i, (mint_str, bonding_curve_pk, _) in enumerate(batch):
+        if accounts is None:
+            results[mint_str] = (None, -1)
+            continue
+        curve_account, ata_account = accounts[2 * i], accounts[2 * i + 1]
+        curve_state = None
+        if curve_account is not None:
+            try:
+                curve_state = parse_bonding_curve_data(curve_account.data)
+            except Exception as e:
+                logger.warning("Error parsing bonding curve %s data: %s", bonding_curve_pk, e)
+        if ata_account is None:
+            balance = 0 # ATA not created yet / closed
+        elif len(ata_account.data) >= SPL_TOKEN_AMOUNT_OFFSET + 8:
+            # SPL token account layout is fixed: mint(32) + owner(32) + amount(u64 LE) + ...
+            balance = int.from_bytes(ata_account.data[SPL_TOKEN_AMOUNT_OFFSET:SPL_TOKEN_AMOUNT_OFFSET + 8], "little")
+        else:
+            balance = -1
+        results[mint_str] = (curve_state, balance)
+    return results
 
-                    if ix_data.startswith(CREATE_IX_DISCRIMINATOR_BYTES):
-                        # Mint is account index 2 in the 'create' instruction's list
-                        if len(ix_raw.accounts) > 2:
-                            # Prevent index out of bounds for accounts list
-                            mint_account_index_in_ix = 2
-                            if mint_account_index_in_ix >= len(ix_raw.accounts): continue
-                            mint_account_index_in_tx = ix_raw.accounts[mint_account_index_in_ix]
-                            # Prevent index out of bounds for message keys
-                            if mint_account_index_in_tx >= len(message.account_keys): continue
-
-                            potential_mint_pk = message.account_keys[mint_account_index_in_tx]
-                            # Simple check: Does it look like a Pubkey? (basic validation)
-                            if len(str(potential_mint_pk)) > 30:
-                                # print(f"  +++ Possible Pump.fun creation by DEV detected. Mint: {potential_mint_pk} in Tx: {sig}")
-                                # Check needed here if it's already monitored is done in the main loop
-                                new_mints.append(str(potential_mint_pk))
-                        break # Found create ix in this tx
-    except SolanaRpcException as e:
-        print(f"Warning: RPC Error parsing transactions: {e}")
-    except Exception as e:
-        print(f"Warning: Unexpected error parsing transactions: {e}")
-        import traceback; traceback.print_exc()
-    # Return unique mints found
-    return list(set(new_mints))
+def submit_state_fetches(tokens):
+    """ Starts fetching bonding curve state and DEV token balance for many tokens: one getMultipleAccounts
+    per MAX_ACCOUNTS_PER_REQUEST // 2 tokens, all in flight concurrently on the RPC pool.
+    `tokens` is a list of (mint_str, bonding_curve_pk, dev_ata_pk). Pass the result to collect_states(). """
+    if not solana_client or not tokens: return [] # Check if client initialized
+    tokens_per_request = MAX_ACCOUNTS_PER_REQUEST // 2 # Curve + ATA per token, kept in the same request
+    return [_rpc_pool.submit(_fetch_states_batch, tokens[start:start + tokens_per_request])
+            for start in range(0, len(tokens), tokens_per_request)]
 
+def collect_states(futures):
+    """ Waits for submit_state_fetches() and returns {mint_str: (curve_state, balance)}. curve_state is the
+    parsed bonding curve, or None if unavailable (missing account, RPC or parse error). The balance is read
+    straight from the fetched SPL token account: 0 if the account doesn't exist, -1 on error. """
+    results = {}
+    for future in futures:
+        results.update(future.result())
+    return results
 
-def execute_sell(mint_pk_str: str, bonding_curve_pk_str: str, dev_ata_pk_str: str, amount_lamports: int, min_sol_output_lamports: int):
-    """ Builds, signs, and sends a Pump.fun sell transaction. Does NOT modify shared state. """
-    if not solana_client or not DEV_WALLET: return False, None # Check prerequisites
-    start_time = time.time()
-    # (Keep the implementation from the last correct version)
-    print(f"Attempting to sell {amount_lamports / 1e6:.6f} tokens [{mint_pk_str[:6]}...]...")
-    print(f"  Min SOL output: {Decimal(min_sol_output_lamports) / Decimal(1e9):.9f} SOL")
+# Latest blockhash shared by all sells: (blockhash, last_valid_block_height, fetched_at monotonic).
+# Rebound, never mutated, so readers need no lock; a duplicate concurrent refresh is harmless.
+_blockhash_cache = (None, 0, 0.0)
 
-    try:
-        mint_pk = Pubkey.from_string(mint_pk_str)
-        bonding_curve_pk = Pubkey.from_string(bonding_curve_pk_str)
-        dev_ata_pk = Pubkey.from_string(dev_ata_pk_str)
-        bonding_curve_ata_pk = get_associated_token_address(bonding_curve_pk, mint_pk)
-    except ValueError as e:
-        print(f"  Error creating Pubkey from string: {e}"); return False, None
+def refresh_blockhash():
+    """ Fetches the latest blockhash into the cache. Raises like get_latest_blockhash. """
+    global _blockhash_cache
+    resp = solana_client.get_latest_blockhash(commitment=Confirmed)
+    _blockhash_cache = (resp.value.blockhash, resp.value.last_valid_block_height, time.monotonic())
+    return _blockhash_cache
 
+def get_cached_blockhash():
+    """ Returns (blockhash, last_valid_block_height), hitting the RPC only if the cached one is older
+    than BLOCKHASH_TTL_SECONDS. """
+    blockhash, last_valid_block_height, fetched_at = _blockhash_cache
+    if blockhash is None or time.monotonic() - fetched_at >= BLOCKHASH_TTL_SECONDS:
+        blockhash, last_valid_block_height, _ = refresh_blockhash()
+    return blockhash, last_valid_block_height
+
+def _refresh_blockhash_quietly():
     try:
-        payload = SELL_INSTRUCTION_PAYLOAD.build({
-            "token_amount": amount_lamports, "min_sol_output": min_sol_output_lamports
-        })
-        instruction_data = SELL_INSTRUCTION_DISCRIMINATOR + payload
+        refresh_blockhash()
+    except Exception as e:
+        logger.warning("Could not prefetch blockhash: %s", e)
+
+def prefetch_blockhash():
+    """ Refreshes the cache on the RPC pool once it's half stale, so sells later in the cycle find a
+    fresh blockhash instead of paying the round trip. """
+    if time.monotonic() - _blockhash_cache[2] >= BLOCKHASH_TTL_SECONDS / 2:
+        _rpc_pool.submit(_refresh_blockhash_quietly)
+
+def _fetch_transactions_batch(signatures):
+    """ One JSON-RPC batch request of getTransaction for up to RPC_BATCH_SIZE signatures (see
+    find_dev_created_pump_fun_mints). Returns {signature: transaction} for the entries that came back;
+    signatures missing from it (null result, RPC error) were not resolved. """
+    requests = tuple(GetTransaction(sig, TRANSACTION_CONFIG, request_id) for request_id, sig in enumerate(signatures))
+    raw = solana_client._provider.make_batch_request_unparsed(requests)
+    transactions = {}
+    # JSON-RPC doesn't promise batch responses in request order: match each one to its request by id
+    for item in orjson.loads(raw):
+        request_id = item.get("id") if isinstance(item, dict) else None
+        if not isinstance(request_id, int) or not 0 <= request_id < len(signatures): continue
+        resp = GetTransactionResp.from_json(orjson.dumps(item).decode())
+        if isinstance(resp, GetTransactionResp) and resp.value and resp.value.transaction:
+            transactions[signatures[request_id]] = resp.value.transaction.transaction
+    return transactions
+
+def _find_create_mint(tx_raw):
+    """ Returns the mint (str) of a Pump.fun 'create' in a DEV-paid transaction, or None. """
+    message = tx_raw.message
+    # Ensure account_keys is not empty before accessing index 0
+    if not message.account_keys or message.account_keys[0] != DEV_PUBLIC_KEY: return None # Check fee payer
 
-        accounts = [
-            AccountMeta(GLOBAL_ACCOUNT, False, False),           # 0. Global
-            AccountMeta(FEE_RECIPIENT, False, True),             # 1. Fee Recipient (W)
+    for ix_raw in message.instructions:
+        # Prevent index out of bounds if program_id_index is invalid
+        if ix_raw.program_id_index >= len(message.account_keys): continue
+        program_id = message.account_keys[ix_raw.program_id_index]
+
+        if program_id == PUMP_FUN_PROGRAM_ID:
+            # Fetched with base64 encoding, solders hands back instruction data as raw bytes:
+            # compare the discriminator directly, nothing to decode
+            if ix_raw.data.startswith(CREATE_IX_DISCRIMINATOR):
+                # Mint is account index 2 in the 'create' instruction's list
+                if len(ix_raw.accounts) > 2:
+                    mint_account_index_in_tx = ix_raw.accounts[2]
+                    # Prevent index out of bounds for message keys
+                    if mint_account_index_in_tx >= len(message.account_keys): continue
+
+                    potential_mint_pk = message.account_keys[mint_account_index_in_tx]
+                    # Simple check: is it a Pubkey? (type check; no base58 encode just to validate)
+                    if isinstance(potential_mint_pk, Pubkey):
+                        # Check needed here if it's already monitored is done in the main loop
+                        return str(potential_mint_pk)
+                return None # Found create ix in this tx
+    return None
+
+def find_dev_created_pump_fun_mints(transactions):
+    """ Parses transactions to find Pump.fun creations by DEV_WALLET using 'create' ix discriminator.
+    Signatures are fetched in JSON-RPC batches of RPC_BATCH_SIZE, all in flight concurrently on the RPC pool.
+    Returns (mints found, signatures that could not be fetched or parsed), both sets. """
+    if not solana_client or not transactions: return set(), set() # Check if client initialized
+    new_mints = set()
+    unresolved = set()
+    batches = [transactions[start:start + RPC_BATCH_SIZE] for start in range(0, len(transactions), RPC_BATCH_SIZE)]
+    futures = [_rpc_pool.submit(_fetch_transactions_batch, batch) for batch in batches]
+    for batch, future in zip(batches, futures):
+        try:
+            fetched = future.result()
+        except SolanaRpcException as e:
+            logger.warning("RPC Error fetching %d transactions: %s", len(batch), e)
+            unresolved.update(batch)
+            continue
+        except Exception as e:
+            logger.warning("Unexpected error fetching %d transactions: %s", len(batch), e, exc_info=True)
+            unresolved.update(batch)
+            continue
+        for sig in batch:
+            tx_raw = fetched.get(sig)
+            if tx_raw is None:
+                unresolved.add(sig)
+                continue
+            try:
+                mint_str = _find_create_mint(tx_raw)
+            except Exception as e:
+                logger.warning("Unexpected error parsing transaction %s: %s", sig, e, exc_info=True)
+                unresolved.add(sig)
+                continue
+            if mint_str: new_mints.add(mint_str)
+    if unresolved:
+        logger.warning("  Could not resolve %d of %d signatures.", len(unresolved), len(transactions))
+    # Unique mints found (a set: callers diff it against monitored_tokens)
+    return new_mints, unresolved
+
+# Full sell account list per mint, so retries skip the ATA derivation and AccountMeta construction.
+# solders instructions/transactions are immutable, so this list is the reusable part; only the
+# instruction data, blockhash and signature change between attempts.
+_sell_accounts_cache = {}
+
+def get_sell_accounts(mint_pk: Pubkey, bonding_curve_pk: Pubkey, dev_ata_pk: Pubkey):
+    """ Returns the 12 sell AccountMetas for a mint, built on first use. """
+    accounts = _sell_accounts_cache.get(mint_pk)
+    if accounts is None:
+        bonding_curve_ata_pk = get_associated_token_address(bonding_curve_pk, mint_pk)
+        accounts = _SELL_METAS_PREFIX + [
             AccountMeta(mint_pk, False, False),                  # 2. Mint
             AccountMeta(bonding_curve_pk, False, True),          # 3. Bonding Curve (W)
             AccountMeta(bonding_curve_ata_pk, False, True),      # 4. Bonding Curve ATA (W)
             AccountMeta(dev_ata_pk, False, True),                # 5. Seller ATA (W)
-            AccountMeta(DEV_PUBLIC_KEY, True, True),             # 6. Seller (WS)
-            AccountMeta(SYS_PROGRAM_ID, False, False),           # 7. System Program
-            AccountMeta(ASSOCIATED_TOKEN_PROGRAM_ID, False, False),# 8. ATA Program
-            AccountMeta(TOKEN_PROGRAM_ID, False, False),         # 9. Token Program
-            AccountMeta(PUMP_FUN_ACCOUNT, False, False),         # 10. Pump Fun Account
-            AccountMeta(RENT_PROGRAM_ID, False, False),          # 11. Rent Sysvar
-        ]
+        ] + _SELL_METAS_SUFFIX
+        _sell_accounts_cache[mint_pk] = accounts
+    return accounts
+
+def execute_sell(mint_pk: Pubkey, bonding_curve_pk: Pubkey, dev_ata_pk: Pubkey, amount_lamports: int, min_sol_output_lamports: int):
+    """ Builds, signs, and sends a Pump.fun sell transaction. Takes parsed keys (see get_token_keys).
+    Does NOT modify shared state. """
+    if not solana_client or not DEV_WALLET: return False, None # Check prerequisites
+    start_time = time.monotonic()
+    # (Keep the implementation from the last correct version)
+    logger.info("Attempting to sell %.6f tokens [%.6s...]...", amount_lamports / 1e6, mint_pk)
+    logger.info("  Min SOL output: %.9f SOL", min_sol_output_lamports / LAMPORTS_PER_SOL)
+
+    try:
+        payload = SELL_INSTRUCTION_PAYLOAD.pack(amount_lamports, min_sol_output_lamports)
+        instruction_data = SELL_INSTRUCTION_DISCRIMINATOR + payload
+        accounts = get_sell_accounts(mint_pk, bonding_curve_pk, dev_ata_pk)
 
         sell_instruction = TransactionInstruction(PUMP_FUN_PROGRAM_ID, instruction_data, accounts)
 
         try:
-            blockhash_resp = solana_client.get_latest_blockhash(commitment=Confirmed)
-            recent_blockhash = blockhash_resp.value.blockhash
-            last_valid_block_height = blockhash_resp.value.last_valid_block_height
+            recent_blockhash, last_valid_block_height = get_cached_blockhash()
         except SolanaRpcException as e:
-             print(f"  Error fetching blockhash: {e}. Cannot proceed with sell."); return False, None
+             logger.error("  Error fetching blockhash: %s. Cannot proceed with sell.", e); return False, None
         except AttributeError: # Handle cases where blockhash_resp.value might be None
-             print("  Error fetching blockhash: Received invalid response."); return False, None
+             logger.error("  Error fetching blockhash: Received invalid response."); return False, None
 
 
-        transaction = Transaction(recent_blockhash=recent_blockhash, fee_payer=DEV_PUBLIC_KEY)
-        if TRANSACTION_PRIORITY_MICRO_LAMPORTS > 0: transaction.add(set_compute_unit_price(TRANSACTION_PRIORITY_MICRO_LAMPORTS))
-        if TRANSACTION_COMPUTE_UNITS > 0: transaction.add(set_compute_unit_limit(TRANSACTION_COMPUTE_UNITS))
-        transaction.add(sell_instruction)
-        transaction.sign(DEV_WALLET)
+        # solders transactions are immutable: compile the message, then sign on construction
+        message = Message.new_with_blockhash(_COMPUTE_BUDGET_IXS + [sell_instruction], DEV_PUBLIC_KEY, recent_blockhash)
+        transaction = Transaction([DEV_WALLET], message, recent_blockhash)
+        # Subscribe before sending so the confirmation notification can't be missed
+        confirm_future = subscribe_signature(transaction.signatures[0])
 
-        print(f"  Sending sell transaction...")
+        logger.info("  Sending sell transaction...")
         opts = TxOpts(skip_preflight=True, preflight_commitment=Confirmed)
         try:
-            send_resp = solana_client.send_transaction(transaction, DEV_WALLET, opts=opts)
+            send_resp = solana_client.send_raw_transaction(bytes(transaction), opts=opts)
             signature = send_resp.value
-            print(f"    Transaction sent: https://solscan.io/tx/{signature}")
-            print(f"    Time to send: {time.time() - start_time:.2f}s")
+            logger.info("    Transaction sent: https://solscan.io/tx/%s", signature)
+            logger.info("    Time to send: %.2fs", time.monotonic() - start_time)
+
+            confirm_start_time = time.monotonic()
+            if confirm_future is not None:
+                logger.info("    Awaiting confirmation notification (up to %ss)...", CONFIRM_TIMEOUT_SECONDS)
+                try:
+                    tx_err = confirm_future.result(timeout=CONFIRM_TIMEOUT_SECONDS)
+                    logger.info("    Confirmation wait duration: %.2fs", time.monotonic() - confirm_start_time)
+                    if tx_err:
+                         logger.warning("    Tx %s failed confirmation: %s", signature, tx_err); return False, str(signature)
+                    logger.info("    +++ Tx CONFIRMED: %s", signature); logger.info("    Total sell time: %.2fs", time.monotonic() - start_time); return True, str(signature)
+                except FutureTimeoutError:
+                    # The feed was live but no notification came: one status check, not the full polling loop
+                    # (which would hold this sell worker for another ~60s)
+                    logger.warning("    No confirmation notification after %ss; checking status once...", CONFIRM_TIMEOUT_SECONDS)
+                    status_resp = solana_client.get_signature_statuses([signature])
+                    tx_status = status_resp.value[0] if status_resp and status_resp.value else None
+                    if tx_status is None or tx_status.confirmation_status not in (
+                        TransactionConfirmationStatus.Confirmed, TransactionConfirmationStatus.Finalized
+                    ):
+                         logger.warning("    Tx %s not confirmed after %ss. Assuming failure.", signature, CONFIRM_TIMEOUT_SECONDS); return False, str(signature)
+                    if tx_status.err:
+                         logger.warning("    Tx %s failed confirmation: %s", signature, tx_status.err); return False, str(signature)
+                    logger.info("    +++ Tx CONFIRMED: %s", signature); logger.info("    Total sell time: %.2fs", time.monotonic() - start_time); return True, str(signature)
+                except Exception as e: # The feed dropped: check by polling below
+                    logger.warning("    WebSocket confirmation unavailable (%s); polling instead...", e)
 
-            print(f"    Confirming transaction (~60s)...")
-            confirm_start_time = time.time()
+            logger.info("    Confirming transaction (~60s)...")
             confirmation_resp = solana_client.confirm_transaction(
                 signature, commitment=Confirmed, sleep_seconds=0.75, last_valid_block_height=last_valid_block_height + 150
             )
-            print(f"    Confirmation check duration: {time.time() - confirm_start_time:.2f}s")
+            logger.info("    Confirmation check duration: %.2fs", time.monotonic() - confirm_start_time)
 
             # Check confirmation response structure carefully
             if not confirmation_resp or not confirmation_resp.value:
-                 print(f"    Tx {signature} confirmation check failed (no response value). Assuming failure."); return False, str(signature)
+                 logger.warning("    Tx %s confirmation check failed (no response value). Assuming failure.", signature); return False, str(signature)
 
             # Access the error status correctly (it's usually in the first element of the value tuple/list)
             tx_result_info = confirmation_resp.value[0]
             if tx_result_info is None:
-                 print(f"    Tx {signature} not found or timed out during confirmation. Assuming failure."); return False, str(signature)
+                 logger.warning("    Tx %s not found or timed out during confirmation. Assuming failure.", signature); return False, str(signature)
             elif tx_result_info.err:
-                 print(f"    Tx {signature} failed confirmation: {tx_result_info.err}"); return False, str(signature)
+                 logger.warning("    Tx %s failed confirmation: %s", signature, tx_result_info.err); return False, str(signature)
             else:
-                 print(f"    +++ Tx CONFIRMED: {signature}"); print(f"    Total sell time: {time.time() - start_time:.2f}s"); return True, str(signature)
+                 logger.info("    +++ Tx CONFIRMED: %s", signature); logger.info("    Total sell time: %.2fs", time.monotonic() - start_time); return True, str(signature)
+
+        except SolanaRpcException as e: logger.error("  RPC Error during send/confirm: %s", e); return False, None # Signature might be in e but often not reliably
+        except Exception as e: logger.exception("  Error sending/confirming sell: %s", e); return False, None
+        finally: forget_signature(confirm_future) # No-op once the notification has arrived
+    except Exception as e: logger.exception("Error building/signing sell: %s", e); return False, None
 
-        except SolanaRpcException as e: print(f"  RPC Error during send/confirm: {e}"); return False, None # Signature might be in e but often not reliably
-        except Exception as e: print(f"  Error sending/confirming sell: {e}"); import traceback; traceback.print_exc(); return False, None
-    except Exception as e: print(f"Error building/signing sell: {e}"); import traceback; traceback.print_exc(); return False, None
 
 
+# --- WebSocket Creation Feed ---
+# A logsSubscribe(mentions=DEV wallet) subscription pushes new creations to the monitor loop, replacing
+# per-cycle getSignaturesForAddress + getTransaction polling. Polling remains as the fallback while
+# the socket is down.
+_ws_creations = queue.Queue() # Mint strings (decoded from CreateEvent) or Signatures to resolve via RPC
+_ws_connected = threading.Event() # Set while the logs subscription is live
+_ws_thread = None
+_ws_loop = None # Event loop of the listener thread; other threads schedule onto it
+_ws_conn = None # Live connection, shared by the logs subscription and sell confirmations
+
+# Requests we send ourselves (signature/curve subscriptions) use ids well clear of the client's
+# counter, so each SubscriptionResult maps back to what asked for it.
+_ws_request_ids = itertools.count(1_000_000)
+
+# signatureSubscribe waiters, only touched on _ws_loop. Notifications map by subscription id.
+# Futures resolve to the transaction error (None on success).
+_sig_pending = {} # request id -> Future
+_sig_subscriptions = {} # subscription id -> Future
+
+def _parse_create_event(data_b64: str):
+    """Decodes a Pump.fun CreateEvent from a 'Program data:' log. Returns (mint, creator) or None."""
+    try:
+        data = base64.b64decode(data_b64)
+    except Exception:
+        return None
+    if not data.startswith(CREATE_EVENT_DISCRIMINATOR):
+        return None
+    try:
+        offset = len(CREATE_EVENT_DISCRIMINATOR)
+        for _ in range(3): # name, symbol, uri: borsh strings (u32 length + bytes)
+            (length,) = struct.unpack_from("<I", data, offset)
+            offset += 4 + length
+        mint_pk = Pubkey.from_bytes(data[offset:offset + 32])
+        creator_pk = Pubkey.from_bytes(data[offset + 64:offset + 96]) # Layout: mint, bonding_curve, user
+        return mint_pk, creator_pk
+    except (struct.error, ValueError):
+        return None
+
+def _handle_dev_logs(logs_value):
+    """ Queues the mint (or, if the event can't be decoded, the signature) of a DEV Pump.fun create. """
+    if logs_value.err is not None: return
+    logs = logs_value.logs
+    if PUMP_FUN_CREATE_LOG not in logs: return
+    if not any(line.startswith(PUMP_FUN_INVOKE_LOG_PREFIX) for line in logs): return
+    for line in logs:
+        if line.startswith(PROGRAM_DATA_LOG_PREFIX):
+            parsed = _parse_create_event(line[len(PROGRAM_DATA_LOG_PREFIX):])
+            if parsed:
+                mint_pk, creator_pk = parsed
+                if creator_pk == DEV_PUBLIC_KEY:
+                    _ws_creations.put(str(mint_pk))
+                    _monitor_wake.set()
+                return
+    _ws_creations.put(logs_value.signature) # Let find_dev_created_pump_fun_mints resolve it
+    _monitor_wake.set()
+
+def _handle_signature_notification(msg):
+    """ Resolves the sell waiting on this (one-shot) signature subscription. """
+    future = _sig_subscriptions.pop(msg.subscription, None)
+    if future is not None and not future.done():
+        future.set_result(getattr(msg.result.value, "err", None))
+
+def _fail_signature_waiters():
+    """ Connection lost: pending confirmations fall back to polling. """
+    for future in itertools.chain(_sig_pending.values(), _sig_subscriptions.values()):
+        if not future.done():
+            future.set_exception(ConnectionError("WebSocket connection lost"))
+    _sig_pending.clear()
+    _sig_subscriptions.clear()
+
+async def _signature_subscribe(signature, future: Future):
+    request_id = next(_ws_request_ids)
+    _sig_pending[request_id] = future
+    try:
+        config = RpcSignatureSubscribeConfig(commitment=CommitmentLevel.Confirmed)
+        await _ws_conn.send_data(SignatureSubscribe(signature, config, request_id))
+    except Exception as e:
+        _sig_pending.pop(request_id, None)
+        if not future.done(): future.set_exception(e)
+
+def _forget_signature_waiter(future: Future):
+    for waiters in (_sig_pending, _sig_subscriptions):
+        for key in [k for k, f in waiters.items() if f is future]:
+            del waiters[key]
+
+def subscribe_signature(signature):
+    """ Subscribes to a signature's confirmation on the shared WebSocket. Returns a Future resolving to
+    the transaction error (None on success), or None if the feed isn't live (caller polls instead). """
+    loop = _ws_loop
+    if loop is None or not _ws_connected.is_set(): return None
+    future = Future()
+    asyncio.run_coroutine_threadsafe(_signature_subscribe(signature, future), loop)
+    return future
+
+def forget_signature(future):
+    """ Drops a waiter that is no longer needed (timed out, or the send failed). """
+    loop = _ws_loop
+    if future is None or loop is None: return
+    future.cancel()
+    loop.call_soon_threadsafe(_forget_signature_waiter, future)
+
+# Set to cut the monitor's inter-cycle wait short: curve updates and pushed creations
+_monitor_wake = threading.Event()
+
+# accountSubscribe on active bonding curves, only touched on _ws_loop. A notification just sets
+# _monitor_wake: the monitor then runs its (batched) cycle right away.
+_curve_pending = {} # request id -> bonding curve Pubkey
+_curve_subscriptions = {} # bonding curve Pubkey -> subscription id
+
+async def _sync_curve_subscriptions(wanted):
+    """ Subscribes to newly active curves and unsubscribes from ones no longer wanted. """
+    if _ws_conn is None: return
+    requested = set(_curve_subscriptions) | set(_curve_pending.values())
+    config = RpcAccountInfoConfig(encoding=UiAccountEncoding.Base64, commitment=CommitmentLevel.Processed)
+    try:
+        for curve_pk in wanted - requested:
+            request_id = next(_ws_request_ids)
+            _curve_pending[request_id] = curve_pk
+            await _ws_conn.send_data(AccountSubscribe(curve_pk, config, request_id))
+        for curve_pk in requested - wanted:
+            subscription_id = _curve_subscriptions.pop(curve_pk, None)
+            if subscription_id is not None:
+                await _ws_conn.send_data(AccountUnsubscribe(subscription_id, next(_ws_request_ids)))
+    except Exception as e:
+        logger.warning("Could not update curve subscriptions: %s", e)
+
+def watch_curves(curve_pks):
+    """ Sets the bonding curves to keep subscribed (no-op unless enabled and the feed is live). """
+    loop = _ws_loop
+    if not CURVE_SUBSCRIPTIONS or loop is None or not _ws_connected.is_set(): return
+    asyncio.run_coroutine_threadsafe(_sync_curve_subscriptions(set(curve_pks)), loop)
+
+async def _recv_messages(websocket):
+    """ Receives one frame as parsed messages. A frame solders can't parse is logged and skipped instead of
+    raised, so it can't take the connection down. The expected case is the bare {"result": true} ack to an
+    AccountUnsubscribe (SubscriptionResult carries a u64). Connection errors still raise. """
+    raw = await super(SolanaWsClientProtocol, websocket).recv() # The raw frame, before solana-py parses it
+    try:
+        return websocket._process_rpc_response(raw)
+    except Exception as e:
+        try:
+            is_ack = isinstance(orjson.loads(raw).get("result"), bool)
+        except Exception:
+            is_ack = False
+        if is_ack:
+            logger.debug("Skipping unsubscribe ack: %.120s", raw)
+        else:
+            logger.warning("Skipping unparsable WebSocket message (%s): %.120s", e, raw)
+        return []
+
+async def _listen_dev_logs():
+    """ Keeps the DEV wallet logs subscription open, reconnecting with exponential backoff. """
+    global _ws_loop, _ws_conn
+    _ws_loop = asyncio.get_running_loop()
+    backoff = 1
+    while True:
+        try:
+            async with ws_connect(WS_URL) as websocket:
+                await websocket.logs_subscribe(RpcTransactionLogsFilterMentions(DEV_PUBLIC_KEY), commitment=Confirmed)
+                _ws_conn = websocket
+                while True: # Until the connection fails (raises)
+                    for msg in await _recv_messages(websocket):
+                        if isinstance(msg, LogsNotification):
+                            _handle_dev_logs(msg.result.value)
+                        elif isinstance(msg, AccountNotification):
+                            _monitor_wake.set()
+                        elif isinstance(msg, SignatureNotification):
+                            _handle_signature_notification(msg)
+                        elif isinstance(msg, SubscriptionResult):
+                            future = _sig_pending.pop(msg.id, None)
+                            curve_pk = _curve_pending.pop(msg.id, None)
+                            if future is not None:
+                                _sig_subscriptions[msg.result] = future
+                            elif curve_pk is not None:
+                                _curve_subscriptions[curve_pk] = msg.result
+                            elif not _ws_connected.is_set():
+                                logger.info("WebSocket creation feed live.")
+                                _ws_connected.set()
+                                backoff = 1
+        except Exception as e:
+            logger.warning("WebSocket creation feed error: %s", e)
+        _ws_connected.clear()
+        _ws_conn = None
+        _fail_signature_waiters()
+        _curve_pending.clear() # Subscriptions die with the connection; the monitor re-requests them
+        _curve_subscriptions.clear()
+        logger.warning("WebSocket creation feed down (polling fallback active). Reconnecting in %ss...", backoff)
+        await asyncio.sleep(backoff)
+        backoff = min(backoff * 2, WS_RECONNECT_MAX_SECONDS)
+
+def _run_ws_listener():
+    """ Listener thread body: runs the feed on uvloop/winloop when installed, else the stdlib loop. """
+    loop = fast_event_loop.new_event_loop() if fast_event_loop else asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+    try:
+        loop.run_until_complete(_listen_dev_logs())
+    finally:
+        loop.close()
+
+def start_ws_listener():
+    """Starts the WebSocket creation feed in a daemon thread (no-op if running or WS_URL is unset)."""
+    global _ws_thread
+    if not WS_URL:
+        logger.info("WS_URL not set; detecting creations by polling only.")
+        return
+    if _ws_thread is not None and _ws_thread.is_alive(): return
+    _ws_thread = threading.Thread(target=_run_ws_listener, daemon=True, name="ws-listener")
+    _ws_thread.start()
+
+def _drain_ws_creations():
+    """Returns everything the WebSocket feed queued since the last call."""
+    items = []
+    while True:
+        try:
+            items.append(_ws_creations.get_nowait())
+        except queue.Empty:
+            return items
+
 
 # --- Main Bot Logic (Modified for Thread Safety) ---
 def monitor_and_sell(lock: threading.Lock): # <<< Accept lock
     """ Main loop to monitor wallet, check tokens, and trigger sells. Uses lock for state access."""
-    global monitored_tokens # Ensure we intend to modify the global
+    global monitored_tokens, last_checked_signature # Ensure we intend to modify the globals
 
     # Ensure client/wallet are initialized before starting loop
     if not solana_client or not DEV_WALLET:
-         print("FATAL: Solana client or Dev Wallet not initialized. Cannot start monitor loop.")
+         logger.critical("Solana client or Dev Wallet not initialized. Cannot start monitor loop.")
          return # Stop the thread
 
-    print("--- Starting Pump.fun Auto-Sell Bot Thread ---")
-    print(f"Wallet: {DEV_PUBLIC_KEY}")
-    print(f"Sell After: {SELL_DELAY_SECONDS}s OR Value >= {TAKE_PROFIT_SOL} SOL | Slippage: {SLIPPAGE_PERCENT}%")
-    print(f"Priority: {TRANSACTION_PRIORITY_MICRO_LAMPORTS} μL/CU | Limit: {TRANSACTION_COMPUTE_UNITS} CU")
-    print("-" * 30)
+    logger.info("--- Starting Pump.fun Auto-Sell Bot Thread ---")
+    logger.info("Wallet: %s", DEV_PUBLIC_KEY)
+    logger.info("Sell After: %ss OR Value >= %s SOL | Slippage: %s%%", SELL_DELAY_SECONDS, TAKE_PROFIT_SOL, SLIPPAGE_PERCENT)
+    logger.info("Priority: %s μL/CU | Limit: %s CU", TRANSACTION_PRIORITY_MICRO_LAMPORTS, TRANSACTION_COMPUTE_UNITS)
 
     try:
         # Initial load using the provided lock
         load_state(lock)
     except Exception as e:
-        print(f"Error during initial state load: {e}. Starting with empty state.")
+        logger.error("Error during initial state load: %s. Starting with empty state.", e)
         with lock: monitored_tokens = {} # Ensure it's initialized after error
+        publish_snapshot(lock)
 
-    last_tx_check_sig = None # Track the last signature checked
+    start_ws_listener()
+    ws_was_live = False # Whether the WebSocket feed was already live at the previous cycle
+    # Failed sells waiting out their backoff, as a min-heap of (earliest retry time, mint). Backoff is per
+    # token: the loop keeps serving every other token instead of sleeping through RETRY_DELAY_SECONDS.
+    # Entries of tokens that left the active set aren't removed; they just expire.
+    retry_heap = []
+    # Failed fetch/parse attempts per DEV signature still being retried (see SIGNATURE_MAX_ATTEMPTS)
+    signature_attempts = {}
+    # Sells handed to _sell_pool and not yet applied: mint -> (Future of execute_sell, attempt number,
+    # bonding curve Pubkey). These tokens sit out of the cycle until their result is in, but keep their
+    # curve subscription and count as activity for the interval.
+    sells_in_flight = {}
+    current_interval = float(CHECK_INTERVAL_SECONDS)
 
     # --- Main Loop ---
     while True: # This loop runs indefinitely in the background thread
         try: # Add a try/except block around the entire cycle for resilience
-            cycle_start_time = time.time()
-            # Use print with flush=True if output seems delayed in thread context
-            print(f"\n--- Bot Cycle Start ({time.strftime('%H:%M:%S')}) ---", flush=True)
+            cycle_start_time = time.monotonic() # Durations and retry times are monotonic; created_at etc. stay wall clock
+            _monitor_wake.clear() # Updates from here on wake the next cycle
+            state_dirty = False # Set by any change worth persisting; saved once at the end of the cycle
+            tokens_added = False # New tokens are first fetched next cycle, which must then come right away
+            logger.info("--- Bot Cycle Start ---") # Timestamp comes from the log format
+            # Release retries that came due; whatever is left in the heap is still backing off
+            while retry_heap and retry_heap[0][0] <= cycle_start_time:
+                heapq.heappop(retry_heap)
+            backing_off = {mint for _, mint in retry_heap}
+
+            # Apply the outcome of sells the workers finished since the last cycle
+            for mint_str, (sell_future, sell_attempts, _) in list(sells_in_flight.items()):
+                if not sell_future.done(): continue
+                del sells_in_flight[mint_str]
+                try:
+                    success, signature = sell_future.result()
+                except Exception as sell_e:
+                    logger.error("    Sell worker error for %.6s...: %s", mint_str, sell_e, exc_info=True)
+                    success, signature = False, None
+                if success:
+                    updates = {"status": "sold", "sell_tx": signature if signature else "success_no_sig"}
+                    logger.info("    +++ SELL SUCCESSFUL for %.6s!", mint_str)
+                else:
+                    updates = {"status": "sell_failed", "sell_tx": f"failed_{signature}" if signature else "failed_no_sig"}
+                    logger.warning("    --- SELL FAILED for %.6s.", mint_str)
+                    if sell_attempts >= MAX_SELL_RETRIES:
+                        logger.warning("    Max sell retries reached after this failed attempt. Marking FAILED_MAX_RETRIES.")
+                        updates["status"] = "failed_max_retries"
+                    else:
+                        logger.info("    Retrying in %ss at the earliest.", RETRY_DELAY_SECONDS)
+                        heapq.heappush(retry_heap, (time.monotonic() + RETRY_DELAY_SECONDS, mint_str))
+                if update_token(lock, mint_str, updates): state_dirty = True
+
+            # Start fetching curve state + DEV balance for every active token (batched getMultipleAccounts,
+            # requests in flight concurrently) so it overlaps with creation detection below. Tokens added
+            # by step 1 are picked up next cycle.
+            # The fields step 2 needs are read here in the same pass (only this thread mutates records,
+            # so they stay valid for the cycle).
+            tokens_to_fetch = []
+            with lock:
+                tracked_count = len(monitored_tokens)
+                active_entries = [(mint_str, data.get("bonding_curve"), data.get("dev_ata"), data["status"], data.get("created_at"),
+                                   data.get("sell_attempts", 0), data.get("decimals", 6))
+                                  for mint_str, data in monitored_tokens.items()
+                                  if data.get("status") in ACTIVE_STATUSES and mint_str not in sells_in_flight]
+            # A record missing a required field (e.g. a hand-edited state file) is skipped, not fatal to the cycle
+            if any(None in (entry[1], entry[2], entry[4]) for entry in active_entries):
+                complete_entries = []
+                for entry in active_entries:
+                    if None in (entry[1], entry[2], entry[4]):
+                        logger.error("  Record for %.6s... lacks bonding_curve, dev_ata or created_at. Skipping.", entry[0])
+                    else:
+                        complete_entries.append(entry)
+                active_entries = complete_entries
+            for mint_str, bonding_curve_str, dev_ata_str, *_ in active_entries:
+                try:
+                    _, bonding_curve_pk, dev_ata_pk = get_token_keys(mint_str, bonding_curve_str, dev_ata_str)
+                    tokens_to_fetch.append((mint_str, bonding_curve_pk, dev_ata_pk))
+                except ValueError as e:
+                    logger.error("  Error with Pubkey for %.6s: %s. Skipping.", mint_str, e)
+            state_futures = submit_state_fetches(tokens_to_fetch)
+            # In-flight sells included, so a sell doesn't drop and re-add its curve's subscription
+            watch_curves(itertools.chain((bonding_curve_pk for _, bonding_curve_pk, _ in tokens_to_fetch),
+                                         (bonding_curve_pk for _, _, bonding_curve_pk in sells_in_flight.values())))
+            if tokens_to_fetch: prefetch_blockhash() # Any active token may sell this cycle
 
             # 1. Check for new creations
             try:
-                signatures_resp = solana_client.get_signatures_for_address(
-                    DEV_PUBLIC_KEY, limit=20, before=last_tx_check_sig, commitment=Confirmed
-                )
-                recent_signatures = [s.signature for s in signatures_resp.value] if signatures_resp.value else []
+                # Pushed by the WebSocket feed: decoded mints, or signatures that still need resolving
+                pushed = _drain_ws_creations()
+                new_mints = {item for item in pushed if isinstance(item, str)}
+                recent_signatures = [item for item in pushed if not isinstance(item, str)]
+
+                ws_live = _ws_connected.is_set()
+                polled_signatures = []
+                if not (ws_live and ws_was_live):
+                    # Feed down or just (re)connected: poll so creations made meanwhile aren't missed.
+                    # until= returns only signatures newer than the watermark (none at steady state);
+                    # without one (first run), just look at the latest few.
+                    if last_checked_signature:
+                        signatures_resp = solana_client.get_signatures_for_address(
+                            DEV_PUBLIC_KEY, limit=1000, until=Signature.from_string(last_checked_signature), commitment=Confirmed
+                        )
+                    else:
+                        signatures_resp = solana_client.get_signatures_for_address(DEV_PUBLIC_KEY, limit=20, commitment=Confirmed)
+                    polled_signatures = [s.signature for s in signatures_resp.value] if signatures_resp.value else []
+                    if polled_signatures:
+                        recent_signatures.extend(polled_signatures)
+                ws_was_live = ws_live
 
                 if recent_signatures:
-                    print(f"  Found {len(recent_signatures)} new signatures to check...")
-                    new_mints = find_dev_created_pump_fun_mints(recent_signatures)
-                    newly_added_count = 0
-                    # Lock acquisition moved inside the loop for granularity
-                    with lock: # <<< Lock before checking/adding to monitored_tokens
-                        for mint_str in new_mints:
-                             if mint_str not in monitored_tokens:
-                                 try:
-                                     mint_pk = Pubkey.from_string(mint_str)
-                                     bonding_curve_pk = derive_bonding_curve_pda(mint_pk)
-                                     dev_ata_pk = get_associated_token_address(DEV_PUBLIC_KEY, mint_pk)
-                                     if mint_pk and bonding_curve_pk and dev_ata_pk:
-                                          print(f"  +++ New DEV token detected! Adding: {mint_str[:6]}... +++")
-                                          monitored_tokens[mint_str] = {
-                                             "bonding_curve": str(bonding_curve_pk), "created_at": time.time(), "status": "monitoring",
-                                             "dev_ata": str(dev_ata_pk), "sell_attempts": 0, "decimals": 6, # Assume 6
-                                             "sell_tx": None, "last_value_sol": "0.0", "last_check_time": time.time()
-                                          }
-                                          newly_added_count += 1
-                                     else:
-                                          print(f"    Skipping invalid keys for mint {mint_str}")
-                                 except Exception as add_err:
-                                     print(f"    Error processing new mint {mint_str}: {add_err}")
-                    if newly_added_count > 0:
-                        save_state(lock)
-                    last_tx_check_sig = recent_signatures[0]
+                    logger.info("  Found %d new signatures to check...", len(recent_signatures))
+                    found_mints, unresolved = find_dev_created_pump_fun_mints(recent_signatures)
+                    new_mints.update(found_mints)
+                    for sig in recent_signatures:
+                        if sig not in unresolved: signature_attempts.pop(sig, None)
+                    # Give up on signatures that keep failing, so one bad transaction can't pin the watermark
+                    # (and force a full catch-up poll) forever
+                    for sig in list(unresolved):
+                        signature_attempts[sig] = signature_attempts.get(sig, 0) + 1
+                        if signature_attempts[sig] >= SIGNATURE_MAX_ATTEMPTS:
+                            logger.warning("  Giving up on signature %s after %d failed attempts.", sig, SIGNATURE_MAX_ATTEMPTS)
+                            del signature_attempts[sig]
+                            unresolved.discard(sig)
+                    # Retry the rest through the until= catch-up poll next cycle, even if the feed stays live
+                    # (this also covers pushed signatures, e.g. not yet visible to getTransaction)
+                    if unresolved: ws_was_live = False
+                    if polled_signatures: # Newest first
+                        # Advance the watermark only over signatures that were all resolved: stop just below
+                        # the oldest unresolved one, so the next poll (until=) fetches it again
+                        resolved_upto = 0
+                        for i, sig in enumerate(polled_signatures):
+                            if sig in unresolved: resolved_upto = i + 1
+                        if resolved_upto < len(polled_signatures):
+                            with lock: last_checked_signature = str(polled_signatures[resolved_upto])
+                            state_dirty = True
+                with lock:
+                    new_mints -= monitored_tokens.keys() # Set difference, no per-mint membership loop
+                if new_mints:
+                    # Derive keys and build records outside the lock; only the inserts need it
+                    new_records = {}
+                    for mint_str in new_mints:
+                        try:
+                            mint_pk = Pubkey.from_string(mint_str)
+                            bonding_curve_pk = derive_bonding_curve_pda(mint_pk)
+                            dev_ata_pk = get_associated_token_address(DEV_PUBLIC_KEY, mint_pk)
+                            if mint_pk and bonding_curve_pk and dev_ata_pk:
+                                 logger.info("  +++ New DEV token detected! Adding: %.6s... +++", mint_str)
+                                 new_records[mint_str] = {
+                                    "bonding_curve": str(bonding_curve_pk), "created_at": time.time(), "status": "monitoring",
+                                    "dev_ata": str(dev_ata_pk), "sell_attempts": 0, "decimals": 6, # Assume 6
+                                    "sell_tx": None, "last_value_sol": "0.0", "last_check_time": time.time()
+                                 }
+                                 _token_keys_cache[mint_str] = (mint_pk, bonding_curve_pk, dev_ata_pk)
+                            else:
+                                 logger.warning("    Skipping invalid keys for mint %s", mint_str)
+                        except Exception as add_err:
+                            logger.error("    Error processing new mint %s: %s", mint_str, add_err)
+                    if new_records:
+                        with lock: monitored_tokens.update(new_records)
+                        publish_snapshot(lock)
+                        state_dirty = True
+                        # Not in this cycle's fetch: check them right after it, at the fastest interval
+                        tokens_added = True
+                        current_interval = MIN_CHECK_INTERVAL_SECONDS
+                        _monitor_wake.set()
             except SolanaRpcException as e:
-                print(f"Warning: RPC Error fetching txs: {e}")
+                logger.warning("RPC Error fetching txs: %s", e)
             except Exception as e:
-                print(f"Warning: Error checking creations: {e}"); import traceback; traceback.print_exc();
+                logger.warning("Error checking creations: %s", e, exc_info=True)
 
             # 2. Check sell conditions for monitored tokens
-            mints_to_process = []
-            with lock:
-                mints_to_process = list(monitored_tokens.keys())
+            if not tracked_count:
+                 logger.info("  No tokens currently being monitored.")
 
-            if not mints_to_process:
-                 print("  No tokens currently being monitored.", flush=True)
+            fetched_states = collect_states(state_futures)
+            checked_at = time.time() # Wall clock (stored, and compared to created_at), read once for all tokens
 
             monitoring_count = 0
-            active_tokens_summary = []
-
-            for mint_str in mints_to_process:
-                token_data_copy = None
-                should_save = False
+            # (mint, balance, value) of monitoring tokens for the summary line; formatted only if it will be logged
+            summary_rows = [] if logger.isEnabledFor(logging.INFO) else None
 
+            for mint_str, bonding_curve_str, dev_ata_str, status, created_at, sell_attempts, decimals in active_entries:
+                # Field changes for this token, written back in one go (see finally)
+                updates = {"last_check_time": checked_at}
                 try:
-                    with lock:
-                        if mint_str not in monitored_tokens: continue
-                        token_data_copy = monitored_tokens[mint_str].copy()
-                        monitored_tokens[mint_str]["last_check_time"] = time.time()
-                    status = token_data_copy["status"]
-                    if status not in ["monitoring", "sell_failed"]: continue
-                    try:
-                        bonding_curve_pk = Pubkey.from_string(token_data_copy["bonding_curve"])
-                        dev_ata_pk = Pubkey.from_string(token_data_copy["dev_ata"])
-                        decimals = token_data_copy.get("decimals", 6)
-                    except ValueError as e:
-                         print(f"  Error with Pubkey for {mint_str[:6]}: {e}. Skipping.")
-                         continue
-                    curve_state = get_bonding_curve_state(bonding_curve_pk)
+                    if mint_str not in fetched_states: continue # Invalid keys
+                    curve_state, dev_balance_lamports = fetched_states[mint_str]
                     if not curve_state:
                          continue
                     if curve_state.get("is_complete", False):
-                         print(f"    Token {mint_str[:6]}... curve complete. Marking MISSED_RAYDIUM.")
-                         with lock:
-                             if monitored_tokens.get(mint_str, {}).get("status") in ["monitoring", "sell_failed"]:
-                                  monitored_tokens[mint_str]["status"] = "missed_raydium"
-                                  should_save = True
+                         logger.info("    Token %.6s... curve complete. Marking MISSED_RAYDIUM.", mint_str)
+                         updates["status"] = "missed_raydium"
                          continue
-                    dev_balance_lamports = get_token_balance(dev_ata_pk)
                     if dev_balance_lamports <= 0:
-                        if status in ["monitoring", "sell_failed"] and dev_balance_lamports == 0:
-                             print(f"    Dev balance for {mint_str[:6]}... is 0. Marking EMPTIED.")
-                             with lock:
-                                 if monitored_tokens.get(mint_str, {}).get("status") in ["monitoring", "sell_failed"]:
-                                     monitored_tokens[mint_str]["status"] = "emptied"
-                                     should_save = True
+                        if dev_balance_lamports == 0:
+                             logger.info("    Dev balance for %.6s... is 0. Marking EMPTIED.", mint_str)
+                             updates["status"] = "emptied"
                         continue
-                    dev_balance_float = Decimal(dev_balance_lamports) / Decimal(10**decimals)
-                    price_dec = curve_state.get("price_sol_per_token", Decimal(0))
-                    if not isinstance(price_dec, Decimal): price_dec = Decimal(0)
-                    current_value_sol = dev_balance_float * price_dec
-                    with lock:
-                         if mint_str in monitored_tokens:
-                              monitored_tokens[mint_str]["last_value_sol"] = str(current_value_sol)
+                    # All decisions use integer lamports; floats below are only for display
+                    current_value_lamports = token_value_lamports(curve_state, dev_balance_lamports)
+                    current_value_sol = current_value_lamports / LAMPORTS_PER_SOL
+                    dev_balance_float = dev_balance_lamports / 10**decimals
+                    updates["last_value_sol"] = f"{current_value_sol:.9f}"
                     if status == "monitoring":
                          monitoring_count += 1
-                         active_tokens_summary.append(f"{mint_str[:6]}({dev_balance_float:.2f}|{current_value_sol:.4f}S)")
+                         if summary_rows is not None: summary_rows.append((mint_str, dev_balance_float, current_value_sol))
                     sell_signal = False
                     trigger_reason = ""
-                    time_elapsed = time.time() - token_data_copy["created_at"]
+                    time_elapsed = checked_at - created_at
                     if time_elapsed >= SELL_DELAY_SECONDS: sell_signal = True; trigger_reason = f"Time({time_elapsed:.0f}s)"
-                    if current_value_sol >= TAKE_PROFIT_SOL:
+                    if current_value_lamports >= TAKE_PROFIT_LAMPORTS:
                         if not sell_signal: trigger_reason = f"Profit(>{TAKE_PROFIT_SOL:.4f}S)"
                         sell_signal = True
+                    if sell_signal and mint_str in backing_off:
+                        continue # Still backing off after a failed attempt
                     if sell_signal:
-                        print(f"\n    >>> SELL SIGNAL for {mint_str[:6]}.. ({trigger_reason}) <<<", flush=True)
-                        print(f"        Value: {current_value_sol:.6f} SOL | Balance: {dev_balance_float:.{decimals}f} | Age: {time_elapsed:.0f}s")
-                        if token_data_copy["sell_attempts"] >= MAX_SELL_RETRIES:
-                            with lock:
-                                 if monitored_tokens.get(mint_str, {}).get("status") != "failed_max_retries":
-                                      monitored_tokens[mint_str]["status"] = "failed_max_retries"
-                                      should_save = True
+                        logger.info("    >>> SELL SIGNAL for %.6s.. (%s) <<<", mint_str, trigger_reason)
+                        logger.info("        Value: %.6f SOL | Balance: %.*f | Age: %.0fs", current_value_sol, decimals, dev_balance_float, time_elapsed)
+                        if sell_attempts >= MAX_SELL_RETRIES:
+                            updates["status"] = "failed_max_retries"
                             continue
-                        expected_sol_output = current_value_sol
-                        min_sol_output = expected_sol_output * (Decimal(100) - SLIPPAGE_PERCENT) / Decimal(100)
-                        min_sol_output = max(Decimal(0), min_sol_output)
-                        min_sol_output_lamports = int(min_sol_output * Decimal(1e9))
+                        min_sol_output_lamports = max(0, current_value_lamports * (10_000 - SLIPPAGE_BPS) // 10_000)
                         if min_sol_output_lamports <= 0:
-                            print(f"    Min SOL output <= 0. Skipping sell attempt for {mint_str[:6]}..")
-                            if status == "sell_failed":
-                                with lock:
-                                     if monitored_tokens.get(mint_str, {}).get("status") == "sell_failed":
-                                          monitored_tokens[mint_str]["status"] = "monitoring"
-                                          monitored_tokens[mint_str]["sell_attempts"] = 0
-                                          should_save = True
+                            logger.info("    Min SOL output <= 0. Skipping sell attempt for %.6s..", mint_str)
+                            updates.update(NO_SELL_UPDATES[status])
                             continue
-                        current_attempt = 0
-                        with lock:
-                            if mint_str in monitored_tokens:
-                                monitored_tokens[mint_str]["sell_attempts"] += 1
-                                current_attempt = monitored_tokens[mint_str]["sell_attempts"]
-                                should_save = True
-                            else: continue
-                        print(f"    Attempting sell (Attempt #{current_attempt}/{MAX_SELL_RETRIES})...", flush=True)
-                        if should_save: save_state(lock)
-                        should_save = False
-                        success, signature = execute_sell(
-                            mint_str, token_data_copy["bonding_curve"], token_data_copy["dev_ata"],
-                            dev_balance_lamports, min_sol_output_lamports
-                        )
-                        with lock:
-                            if mint_str not in monitored_tokens: continue
-                            if success:
-                                monitored_tokens[mint_str]["status"] = "sold"
-                                monitored_tokens[mint_str]["sell_tx"] = signature if signature else "success_no_sig"
-                                should_save = True
-                                print(f"    +++ SELL SUCCESSFUL for {mint_str[:6]}!")
-                            else:
-                                monitored_tokens[mint_str]["status"] = "sell_failed"
-                                monitored_tokens[mint_str]["sell_tx"] = f"failed_{signature}" if signature else "failed_no_sig"
-                                should_save = True
-                                print(f"    --- SELL FAILED for {mint_str[:6]}.")
-                                if monitored_tokens[mint_str]["sell_attempts"] >= MAX_SELL_RETRIES:
-                                    print(f"    Max sell retries reached after this failed attempt. Marking FAILED_MAX_RETRIES.")
-                                    monitored_tokens[mint_str]["status"] = "failed_max_retries"
-                                else:
-                                     print(f"    Waiting {RETRY_DELAY_SECONDS}s before next cycle might retry.")
-                                     time.sleep(RETRY_DELAY_SECONDS)
-                    elif status == "sell_failed":
-                         print(f"    Sell signal reset for {mint_str[:6]}... Reverting to monitoring.")
-                         with lock:
-                             if monitored_tokens.get(mint_str, {}).get("status") == "sell_failed":
-                                  monitored_tokens[mint_str]["status"] = "monitoring"
-                                  monitored_tokens[mint_str]["sell_attempts"] = 0
-                                  should_save = True
-                    if should_save:
+                        sell_attempts += 1
+                        updates["sell_attempts"] = sell_attempts
+                        logger.info("    Attempting sell (Attempt #%d/%d)...", sell_attempts, MAX_SELL_RETRIES)
+                        # Record the attempt before sending, so it counts even if the sell never returns
+                        update_token(lock, mint_str, updates)
+                        updates = {}
+                        publish_snapshot(lock)
                         save_state(lock)
+                        # Hand the send + confirmation to a sell worker and move on to the next token;
+                        # the result is applied at the start of a later cycle (woken as soon as it's in)
+                        mint_pk, bonding_curve_pk, dev_ata_pk = get_token_keys(mint_str, bonding_curve_str, dev_ata_str) # Cached: no re-decoding
+                        sell_future = _sell_pool.submit(
+                            execute_sell, mint_pk, bonding_curve_pk, dev_ata_pk, dev_balance_lamports, min_sol_output_lamports
+                        )
+                        sell_future.add_done_callback(lambda _: _monitor_wake.set())
+                        sells_in_flight[mint_str] = (sell_future, sell_attempts, bonding_curve_pk)
+                    elif NO_SELL_UPDATES[status]:
+                         logger.info("    Sell signal reset for %.6s... Reverting to monitoring.", mint_str)
+                         updates.update(NO_SELL_UPDATES[status])
                 except Exception as inner_e:
-                    print(f"!! Error processing token {mint_str[:6]}...: {inner_e}")
-                    import traceback
-                    traceback.print_exc()
-            if monitoring_count > 0:
-                summary_str = " | ".join(active_tokens_summary)
-                print(f"  Monitoring {monitoring_count} tokens: [ {summary_str} ]", flush=True)
-            cycle_duration = time.time() - cycle_start_time
-            wait_time = max(0, CHECK_INTERVAL_SECONDS - cycle_duration)
-            print(f"--- Bot Cycle End (Took {cycle_duration:.2f}s) --- Wait {wait_time:.2f}s ---", flush=True)
-            if wait_time > 0:
-                time.sleep(wait_time)
+                    logger.exception("!! Error processing token %.6s...: %s", mint_str, inner_e)
+                finally:
+                    if updates and update_token(lock, mint_str, updates): state_dirty = True
+            publish_snapshot(lock) # Pick up every change made this cycle
+            if state_dirty:
+                save_state(lock)
+            if monitoring_count > 0 and summary_rows is not None:
+                summary_str = " | ".join(f"{mint[:6]}({balance:.2f}|{value:.4f}S)" for mint, balance, value in summary_rows)
+                logger.info("  Monitoring %d tokens: [ %s ]", monitoring_count, summary_str)
+            now = time.monotonic()
+            cycle_duration = now - cycle_start_time
+            # AIMD: back off multiplicatively while cycles eat over half the interval or nothing is
+            # active (a pending sell or a newly added token counts as activity), otherwise tighten gently
+            # toward the floor
+            if not (active_entries or sells_in_flight or tokens_added) or cycle_duration > 0.5 * current_interval:
+                current_interval = min(MAX_CHECK_INTERVAL_SECONDS, current_interval * 1.5)
+            else:
+                current_interval = max(MIN_CHECK_INTERVAL_SECONDS, current_interval * 0.9)
+            wait_time = max(0, current_interval - cycle_duration)
+            # Wake in time for the earliest time-based sell and the earliest pending retry (the heap's
+            # head), however long the interval has grown. Both are taken as seconds from now.
+            now_wall = time.time()
+            upcoming = [created_at + SELL_DELAY_SECONDS - now_wall for _, _, _, status, created_at, _, _ in active_entries
+                        if status == "monitoring" and created_at + SELL_DELAY_SECONDS > checked_at] # Already-due sells are handled (or backing off)
+            if retry_heap: upcoming.append(retry_heap[0][0] - now)
+            if upcoming:
+                wait_time = min(wait_time, max(0, min(upcoming)))
+            logger.info("--- Bot Cycle End (Took %.2fs) --- Wait %.2fs ---", cycle_duration, wait_time)
+            # Sleep until the next cycle, or until a subscribed curve changes (not sooner than the floor)
+            if wait_time > 0 and _monitor_wake.wait(wait_time):
+                time.sleep(max(0, CURVE_WAKE_MIN_INTERVAL_SECONDS - (time.monotonic() - cycle_start_time)))
         except KeyboardInterrupt:
-             print("Keyboard interrupt received in bot thread. Exiting loop.")
+             logger.info("Keyboard interrupt received in bot thread. Exiting loop.")
              break
         except Exception as cycle_e:
-             print(f"!!! UNEXPECTED ERROR IN BOT CYCLE: {cycle_e}")
-             import traceback
-             traceback.print_exc()
-             print("Waiting for a longer interval before retrying cycle...")
+             logger.exception("!!! UNEXPECTED ERROR IN BOT CYCLE: %s", cycle_e)
+             logger.info("Waiting for a longer interval before retrying cycle...")
              time.sleep(CHECK_INTERVAL_SECONDS * 5)
-    print("Monitor loop finished.")
+    logger.info("Monitor loop finished.")
     save_state(lock)
 # --- Remove the original entry point ---
 # (The `if __name__ == "__main__":` block is not needed here as app.py runs it)